@@ -0,0 +1,118 @@
+"""Compact Plotly scatter animations.
+
+`px.scatter(animation_frame=...)` repeats every trace property (hover texts,
+ids, templates, colors) in every frame. Here, the first frame carries the full
+traces and shared layout (fixed axis ranges, one trace per color category), and
+every frame only carries the numbers that change: x, y and marker size, as
+float32 arrays (which Plotly sends base64-encoded).
+"""
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+FRAME_DURATION_MS = 500
+
+
+def _animate_args(frames, duration):
+    return [
+        frames,
+        {
+            "frame": {"duration": duration, "redraw": False},
+            "mode": "immediate",
+            "fromcurrent": True,
+            "transition": {"duration": duration, "easing": "linear"},
+        },
+    ]
+
+
+def animated_scatter(df, frame, group, x, y, size, color, log_x=False, size_max=20, **kwargs):
+    """A scatter plot of `df` animated over the values of the `frame` column.
+
+    `group` identifies a point across frames (e.g. a country), so points move
+    instead of being redrawn. Every group must be in every frame. Other
+    arguments are passed to `px.scatter`.
+    """
+    frame_values = sorted(df[frame].unique())
+    # One row per group, one column per frame and value.
+    values = df.pivot(index=group, columns=frame, values=[x, y, size])
+
+    def padded(low, high, log=False):
+        if log:
+            low, high = np.log10(low), np.log10(high)
+        padding = (high - low) * 0.05
+        return [low - padding, high + padding]
+
+    fig = px.scatter(
+        df[df[frame] == frame_values[0]],
+        x=x,
+        y=y,
+        size=size,
+        color=color,
+        animation_group=group,
+        log_x=log_x,
+        size_max=size_max,
+        **kwargs,
+    )
+    # Ranges and marker scale cover all frames, so they don't change between them.
+    fig.update_layout(
+        xaxis_range=padded(df[x].min(), df[x].max(), log=log_x),
+        yaxis_range=padded(df[y].min(), df[y].max()),
+    )
+    fig.update_traces(marker_sizeref=2.0 * df[size].max() / size_max**2)
+
+    groups = [values.loc[list(trace.ids)] for trace in fig.data]
+    fig.frames = [
+        go.Frame(
+            name=str(frame_value),
+            data=[
+                go.Scatter(
+                    x=rows[(x, frame_value)].to_numpy(np.float32),
+                    y=rows[(y, frame_value)].to_numpy(np.float32),
+                    marker_size=rows[(size, frame_value)].to_numpy(np.float32),
+                )
+                for rows in groups
+            ],
+            traces=list(range(len(fig.data))),
+        )
+        for frame_value in frame_values
+    ]
+    fig.update_layout(
+        updatemenus=[
+            {
+                "type": "buttons",
+                "direction": "left",
+                "x": 0.1,
+                "y": 0,
+                "xanchor": "right",
+                "yanchor": "top",
+                "pad": {"r": 10, "t": 70},
+                "showactive": False,
+                "buttons": [
+                    {"label": "&#9654;", "method": "animate", "args": _animate_args(None, FRAME_DURATION_MS)},
+                    {"label": "&#9724;", "method": "animate", "args": _animate_args([None], 0)},
+                ],
+            }
+        ],
+        sliders=[
+            {
+                "active": 0,
+                "x": 0.1,
+                "y": 0,
+                "xanchor": "left",
+                "yanchor": "top",
+                "len": 0.9,
+                "pad": {"b": 10, "t": 60},
+                "currentvalue": {"prefix": f"{frame}="},
+                "steps": [
+                    {
+                        "label": str(frame_value),
+                        "method": "animate",
+                        "args": _animate_args([str(frame_value)], 0),
+                    }
+                    for frame_value in frame_values
+                ],
+            }
+        ],
+    )
+    return fig
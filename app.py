@@ -0,0 +1,55 @@
+"""ASGI entrypoint: the Streamlit app plus server-side routes.
+
+Run with `streamlit run app.py` (or `uvicorn app:app`) to enable the routes and
+to fill the caches at startup.
+"""
+
+from contextlib import asynccontextmanager
+
+import anyio
+import streamlit as st
+
+import dashboard_data
+import matrix  # noqa: F401 (registers its prewarm hook)
+from cache import run_prewarm
+from companies import company_table
+from data import tag_options
+from export import export_routes, iter_chunks
+from tags import tag_filter
+
+
+def companies(params):
+    # The same live table as on the home page.
+    companies_df, derived = company_table().snapshot()
+    chunks = iter_chunks(companies_df)
+    tags = params.getlist("tag")
+    if tags:
+        match = params.get("match", "any")
+        # Raises ValueError for unknown tags or `match` before the response starts.
+        tag_filter(derived["tags"][:0], tags, tag_options, match)
+        # Snapshot rows are numbered by position, like the rows of their tag masks.
+        chunks = (
+            chunk[tag_filter(derived["tags"][chunk.index], tags, tag_options, match)]
+            for chunk in chunks
+        )
+    return chunks
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Fill the caches before the server accepts its first connection.
+    await anyio.to_thread.run_sync(run_prewarm)
+    yield
+
+
+app = st.App(
+    "streamlit_app.py",
+    lifespan=lifespan,
+    routes=export_routes(
+        {
+            "companies": companies,
+            "performance_controls": lambda params: iter_chunks(dashboard_data.performance_controls()),
+            "regional_markets": lambda params: iter_chunks(dashboard_data.regional_markets()),
+        }
+    ),
+)
@@ -0,0 +1,38 @@
+"""Arrow IPC serialization with optional zstd/LZ4 buffer compression.
+
+Streamlit's frontend can't decode compressed IPC buffers, so the Arrow payloads
+of `st.dataframe` and the charts are compressed on the websocket instead
+(`server.enableWebsocketCompression` in `.streamlit/config.toml`). These
+helpers compress payloads that are read back by pyarrow, e.g. the shared cache.
+`python benchmark.py transport` compares the options.
+"""
+
+import pyarrow as pa
+
+CODECS = ("zstd", "lz4")
+
+# Compressing small tables costs more time than it saves bytes.
+COMPRESSION_THRESHOLD_BYTES = 64 * 1024
+
+
+def to_ipc(df, compression="zstd", threshold=COMPRESSION_THRESHOLD_BYTES):
+    """Serialize a DataFrame as an Arrow IPC stream.
+
+    Buffers are compressed with `compression` (one of `CODECS`, or None) if the
+    table holds at least `threshold` bytes.
+    """
+    if compression is not None and compression not in CODECS:
+        raise ValueError(f"compression must be one of {CODECS} or None, got {compression!r}")
+    table = pa.Table.from_pandas(df)
+    if table.nbytes < threshold:
+        compression = None
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def from_ipc(data):
+    # Compressed buffers are detected and decompressed by the reader.
+    return pa.ipc.open_stream(data).read_all().to_pandas()
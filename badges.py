@@ -0,0 +1,102 @@
+"""A grid of labeled badges rendered as a single element.
+
+Building each field from `st.container`, `st.write` and `st.badge` sends three
+elements per field to the browser, which adds up with many fields. `badge_grid`
+renders all of them as one `st.html` element that lays itself out with CSS grid.
+"""
+
+from html import escape
+
+import streamlit as st
+
+# Text and background of each badge color in Streamlit's light theme, for the
+# colors that `.streamlit/config.toml` doesn't set.
+_DEFAULT_COLORS = {
+    "red": ("#9e303b", "#fff1f2"),
+    "orange": ("#9b4519", "#fff6ed"),
+    "yellow": ("#956b0f", "#fffae5"),
+    "blue": ("#244fb4", "#edf5ff"),
+    "green": ("#0c5a44", "#f1fbf6"),
+    "violet": ("#6f33b8", "#f8f2ff"),
+    "gray": ("#686255", "#f5f4f2"),
+}
+_DEFAULT_PRIMARY = "#ff4b4b"
+
+COLORS = [*_DEFAULT_COLORS, "grey", "primary"]
+
+
+def _theme_color(color):
+    """Text and background color of `color` badges in the app's theme.
+
+    Follows Streamlit: `theme.<color>TextColor` and `theme.<color>BackgroundColor`
+    if set, else shades of `theme.<color>Color`, else the default theme's.
+    """
+    if color not in COLORS:
+        raise ValueError(f"Unknown badge color {color!r}, expected one of {', '.join(COLORS)}")
+    if color == "primary":
+        primary = st.get_option("theme.primaryColor") or _DEFAULT_PRIMARY
+        return primary, f"color-mix(in srgb, {primary} 10%, transparent)"
+    color = "gray" if color == "grey" else color
+    text, background = _DEFAULT_COLORS[color]
+    main = st.get_option(f"theme.{color}Color")
+    if main:
+        text = f"color-mix(in srgb, {main} 85%, black)"
+        background = f"color-mix(in srgb, {main} 10%, transparent)"
+    return (
+        st.get_option(f"theme.{color}TextColor") or text,
+        st.get_option(f"theme.{color}BackgroundColor") or background,
+    )
+
+
+# The styles are sent once, so each field only costs its markup.
+_STYLE = """<style>
+.badge-grid { display: grid; gap: 1rem; }
+.badge-grid-label { font-weight: 600; }
+.badge-grid-badge { display: inline-flex; align-items: center; gap: 0.2em; padding: 0 0.4em;
+  border-radius: 0.5em; font-size: 0.875rem; }
+.badge-grid-icon { font-family: "Material Symbols Rounded"; font-size: 1.1em; line-height: 1; }
+%s
+</style>"""
+
+
+def _icon(icon):
+    # ":material/globe:" -> the "globe" ligature of the font Streamlit bundles.
+    if not icon:
+        return ""
+    if icon.startswith(":material/") and icon.endswith(":"):
+        return f'<span class="badge-grid-icon">{escape(icon[len(":material/") : -1])}</span>'
+    return f"<span>{escape(icon)}</span>"
+
+
+def badge_grid_html(records, column_width=160):
+    """HTML for a grid of `(label, badge, icon, color)` records."""
+    colors = {}
+    cells = []
+    for label, badge, icon, color in records:
+        if color not in colors:
+            colors[color] = _theme_color(color)
+        cells.append(
+            f'<div><div class="badge-grid-label">{escape(label)}</div>'
+            f'<span class="badge-grid-badge badge-grid-{color}">{_icon(icon)}{escape(badge)}</span></div>'
+        )
+    color_styles = "\n".join(
+        f".badge-grid-{color} {{ color: {text}; background: {background}; }}"
+        for color, (text, background) in sorted(colors.items())
+    )
+    return (
+        _STYLE % color_styles
+        + '<div class="badge-grid" style="grid-template-columns: '
+        + f'repeat(auto-fill, minmax({column_width}px, 1fr))">'
+        + "".join(cells)
+        + "</div>"
+    )
+
+
+def badge_grid(records, column_width=160):
+    """Show `(label, badge, icon, color)` records as a grid of badges.
+
+    `icon` is a Material icon (":material/globe:") or an emoji, and `color`
+    one of the colors of `st.badge`, as configured in the app's theme. Columns
+    are at least `column_width` pixels wide and wrap to fit the container.
+    """
+    return st.html(badge_grid_html(records, column_width))
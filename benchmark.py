@@ -0,0 +1,859 @@
+"""Performance benchmarks for the app's pages.
+
+- `python benchmark.py imports` prints a cold-start import breakdown for every
+  page in `streamlit_app.py`'s navigation and appends the totals to a local
+  history. Exits with status 1 if a page imports a library it should defer, or
+  got slower than the recent history by more than a threshold.
+- `python benchmark.py fcp` measures first-contentful-paint of a running app in
+  a local headless browser (requires `playwright`).
+- `python benchmark.py search` measures build time and per-keystroke latency of
+  the typeahead search index.
+- `python benchmark.py styling` compares status color-coding via pandas Styler
+  with the vectorized colored labels used in the dashboard.
+- `python benchmark.py cache` compares cache hit latency of `st.cache_data` with
+  the cross-process `shared_cache`.
+- `python benchmark.py selection` compares raw chart and dataframe selection
+  payloads with their compact `IndexSet` encoding on million-point selections.
+- `python benchmark.py transport` compares bytes sent, encode time and decode
+  time of the dataframe and chart payloads with websocket (deflate) compression
+  and zstd/LZ4 compressed Arrow IPC.
+- `python benchmark.py cdc` compares a full reload of a table with an
+  incremental refresh of the rows changed since the last one.
+- `python benchmark.py animation` compares build time and payload size of the
+  gapminder animation built with `px.scatter` and with `animated_scatter`.
+- `python benchmark.py badges` compares the elements and rerun time of a grid of
+  badges built from one element per field and from a single `badge_grid`.
+- `python benchmark.py tabs` compares reruns of tabs that run every body with
+  tabs that only run the open one.
+- `python benchmark.py dtypes` shows how many bytes of memory and Arrow payload
+  compacting the dtypes of the app's tables saves.
+- `python benchmark.py pages` measures rerun time, peak memory and payload
+  bytes of every page and view, appends them to a local history and exits with
+  status 1 if any got worse than the recent history by more than a threshold.
+- `python benchmark.py sessions` runs many simulated sessions through
+  `streamlit_app.py` and exits with status 1 if memory keeps growing per session.
+"""
+
+import argparse
+import ast
+import gc
+import json
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+# Heavy libraries that are only needed by one section of a page, and must be
+# imported there instead of at the top of the page.
+DEFERRED_IMPORTS = {
+    "home.py": ["plotly", "pydeck"],
+}
+IMPORTS_HISTORY_PATH = ROOT / ".benchmarks" / "imports.jsonl"
+
+# Views of each page, by the label of the `st.segmented_control` that switches them.
+PAGE_VIEWS = {
+    "home.py": ("Selection examples", ["Chart", "Dataframe", "Map"]),
+    "dashboard.py": ("View", ["Performance Overview", "Product Metrics", "Market Trends"]),
+}
+PAGES_HISTORY_PATH = ROOT / ".benchmarks" / "pages.jsonl"
+
+
+def app_pages():
+    tree = ast.parse((ROOT / "streamlit_app.py").read_text())
+    return [
+        node.args[0].value
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == "Page"
+        and node.args
+        and isinstance(node.args[0], ast.Constant)
+    ]
+
+
+def top_level_imports(page):
+    tree = ast.parse((ROOT / page).read_text())
+    return [
+        ast.unparse(node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+
+
+def import_times(code):
+    """Run `code` in a fresh interpreter with `-X importtime`.
+
+    Returns a dict mapping each top-level module to its cumulative import time
+    in milliseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented below the module that triggered them.
+        if not name[1:].startswith(" "):
+            times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def read_history(path):
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines() if line]
+
+
+def append_history(path, results):
+    commit = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+    ).stdout.strip()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as file:
+        file.write(json.dumps({"time": time.time(), "commit": commit, "results": results}) + "\n")
+
+
+def bench_imports(args):
+    # Modules imported by the interpreter itself (site, encodings, ...) aren't
+    # the page's fault.
+    startup = import_times("pass")
+    # Compare with the median of recent runs, which is less noisy than the last one.
+    history = read_history(args.history)[-args.baseline_runs :]
+    results = {}
+    failed = False
+    for page in app_pages():
+        code = "\n".join(top_level_imports(page))
+        runs = [
+            {name: ms for name, ms in import_times(code).items() if name not in startup}
+            for _ in range(args.repeat)
+        ]
+        modules = {name: statistics.median(run.get(name, 0) for run in runs) for name in runs[0]}
+        total = results[page] = statistics.median(sum(run.values()) for run in runs)
+
+        eager = [
+            name
+            for name in modules
+            for deferred in DEFERRED_IMPORTS.get(page, [])
+            if name == deferred or name.startswith(deferred + ".")
+        ]
+        past = [run["results"][page] for run in history if page in run["results"]]
+        baseline = statistics.median(past) if past else None
+        slower = baseline is not None and total > baseline * (1 + args.threshold)
+        failed |= bool(eager) or slower
+
+        status = "REGRESSION" if slower else "ok"
+        baseline_text = f"baseline {baseline:.0f} ms" if baseline is not None else "no baseline yet"
+        print(f"{page}: {total:.0f} ms ({baseline_text}) {status}")
+        if eager:
+            print(f"  imports {', '.join(eager)} at the top, which should be deferred")
+        for name, ms in sorted(modules.items(), key=lambda item: -item[1])[: args.top]:
+            print(f"  {ms:8.1f} ms  {name}")
+
+    if not args.no_save:
+        append_history(args.history, results)
+    return 1 if failed else 0
+
+
+def first_contentful_paint(browser, url):
+    # A fresh context has an empty HTTP cache, like a first visit.
+    context = browser.new_context()
+    page = context.new_page()
+    page.goto(url, wait_until="networkidle")
+    fcp = page.evaluate(
+        "performance.getEntriesByName('first-contentful-paint')[0]?.startTime"
+    )
+    context.close()
+    return fcp
+
+
+def bench_fcp(args):
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch()
+        runs = [first_contentful_paint(browser, args.url) for _ in range(args.repeat)]
+        browser.close()
+    print(f"{args.url}: first-contentful-paint {statistics.median(runs):.0f} ms (median of {args.repeat})")
+    return 0
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def bench_search(args):
+    from search import SearchIndex
+
+    rng = random.Random(0)
+    words = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 10))) for _ in range(5000)]
+    entries = [" ".join(rng.choices(words, k=rng.randint(1, 4))).title() for _ in range(args.size)]
+
+    start = time.perf_counter()
+    index = SearchIndex(entries)
+    print(f"Built index over {args.size:,} entries in {time.perf_counter() - start:.1f} s")
+
+    # Simulate typing: every prefix of random words, one query per keystroke.
+    latencies = []
+    for word in rng.choices(words, k=args.queries):
+        for end in range(1, len(word) + 1):
+            start = time.perf_counter()
+            index.search(word[:end], limit=args.limit)
+            latencies.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{len(latencies):,} queries: p50 {percentile(latencies, 0.5):.3f} ms, "
+        f"p99 {percentile(latencies, 0.99):.3f} ms, max {max(latencies):.3f} ms"
+    )
+    return 0
+
+
+def bench_styling(args):
+    import numpy as np
+    import pandas as pd
+    from streamlit import dataframe_util
+    from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+    from streamlit.proto.ArrowData_pb2 import ArrowData as ArrowProto
+
+    from styling import colored_labels
+
+    colors = {"On Track": "green", "At Risk": "orange", "Below Target": "red"}
+    css = {"On Track": "color: green", "At Risk": "color: orange", "Below Target": "color: red"}
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "KPI Code": [f"KPI-{i:06d}" for i in range(args.rows)],
+            "Status": rng.choice(list(colors), size=args.rows),
+            "Department": rng.choice(["Sales", "Marketing", "Finance"], size=args.rows),
+        }
+    )
+
+    def styler():
+        # Streamlit refuses to render Styler tables this big by default.
+        pd.set_option("styler.render.max_elements", df.size)
+        styled = df.style.map(lambda value: css.get(value, ""), subset=["Status"])
+        proto = ArrowProto()
+        marshall_styler(proto, styled, "benchmark")
+        proto.data = dataframe_util.convert_pandas_df_to_arrow_bytes(df)
+        return proto.ByteSize()
+
+    def labels():
+        labeled = df.assign(Status=colored_labels(df["Status"], colors))
+        return len(dataframe_util.convert_pandas_df_to_arrow_bytes(labeled))
+
+    for name, func in [("Styler.map", styler), ("colored_labels", labels)]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        size = func()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            f"{name:>15}: {elapsed * 1000:8.0f} ms, peak {peak / 2**20:7.1f} MiB, "
+            f"payload {size / 2**20:6.1f} MiB ({args.rows:,} rows)"
+        )
+    return 0
+
+
+def bench_cache(args):
+    import tempfile
+
+    import numpy as np
+    import pandas as pd
+    import streamlit as st
+    from streamlit.logger import set_log_level
+
+    from cache import SqliteBackend, shared_cache
+
+    set_log_level("error")
+    backend = SqliteBackend(Path(tempfile.mkdtemp()) / "benchmark.sqlite")
+    rng = np.random.default_rng(0)
+
+    for rows in args.rows:
+        df = pd.DataFrame(
+            {
+                "id": np.arange(rows),
+                "value": rng.random(rows),
+                "category": rng.choice(["a", "b", "c"], rows),
+            }
+        )
+
+        # `rows` is part of the cache key, so each size gets its own entry.
+        def load(rows):
+            return df
+
+        in_process = st.cache_data(load)
+        shared = shared_cache(load, backend=backend)
+        for name, func in [("st.cache_data", in_process), ("shared_cache", shared)]:
+            func(rows)  # Miss, fills the cache.
+            latencies = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                func(rows)
+                latencies.append((time.perf_counter() - start) * 1000)
+            print(f"{rows:>9,} rows  {name:>13}: hit {statistics.median(latencies):8.3f} ms")
+    return 0
+
+
+def bench_selection(args):
+    import numpy as np
+    import pandas as pd
+
+    from selection import IndexSet
+
+    rng = np.random.default_rng(0)
+    rows = args.points * 2
+    df = pd.DataFrame({"x": rng.random(rows), "y": rng.random(rows)})
+    selections = {
+        "range": np.arange(args.points) + args.points // 2,
+        "every other": np.arange(0, rows, 2),
+        "random": np.sort(rng.choice(rows, args.points, replace=False)),
+    }
+
+    for name, indices in selections.items():
+        # What st.plotly_chart returns for these points, and st.dataframe for the rows.
+        points = [
+            {"curve_number": 0, "point_number": i, "point_index": i, "x": x, "y": y}
+            for i, x, y in zip(indices.tolist(), df["x"].iloc[indices], df["y"].iloc[indices])
+        ]
+        raw = {
+            "points": len(json.dumps({"points": points, "point_indices": indices.tolist()})),
+            "rows": len(json.dumps({"rows": indices.tolist()})),
+        }
+
+        start = time.perf_counter()
+        index_set = IndexSet(indices)
+        encode = time.perf_counter() - start
+        compact = len(json.dumps(index_set.to_json()))
+        start = time.perf_counter()
+        index_set.take(df)
+        materialize = time.perf_counter() - start
+
+        print(
+            f"{name:>11}: points {raw['points'] / 2**20:6.1f} MiB, rows {raw['rows'] / 2**20:5.1f} MiB "
+            f"-> {compact:,} bytes ({index_set!r}); "
+            f"encode {encode * 1000:5.1f} ms, materialize {materialize * 1000:5.1f} ms"
+        )
+    return 0
+
+
+def deflate(data):
+    # The websocket's permessage-deflate defaults (12 window bits, memLevel 5).
+    compressor = zlib.compressobj(wbits=-12, memLevel=5)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def inflate(data):
+    return zlib.decompressobj(wbits=-12).decompress(data)
+
+
+def bench_transport(args):
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    from streamlit import dataframe_util
+
+    from arrow_ipc import to_ipc
+    from data import df as companies
+
+    def read_arrow(data):
+        return pa.ipc.open_stream(data).read_all()
+
+    # (encode, decode) pairs. Decoding uses pyarrow as a stand-in for the browser.
+    methods = {
+        "arrow": (dataframe_util.convert_pandas_df_to_arrow_bytes, read_arrow),
+        "deflate": (
+            lambda df: deflate(dataframe_util.convert_pandas_df_to_arrow_bytes(df)),
+            lambda data: read_arrow(inflate(data)),
+        ),
+        "zstd": (lambda df: to_ipc(df, "zstd", threshold=0), read_arrow),
+        "lz4": (lambda df: to_ipc(df, "lz4", threshold=0), read_arrow),
+    }
+
+    rng = np.random.default_rng(0)
+    for rows in args.rows:
+        tables = {
+            "companies": companies.sample(rows, replace=True, random_state=0).reset_index(drop=True),
+            # Like the dashboard's line charts, at a higher resolution.
+            "time series": pd.DataFrame(
+                rng.integers(0, 20, size=(rows, 3)),
+                columns=["Smart Home", "Office IoT", "Industrial Sensors"],
+                index=pd.date_range("2023-06-01", periods=rows, freq="min"),
+            ),
+        }
+        for table_name, df in tables.items():
+            for name, (encode, decode) in methods.items():
+                encode_times, decode_times = [], []
+                for _ in range(args.repeat):
+                    start = time.process_time()
+                    data = encode(df)
+                    encode_times.append(time.process_time() - start)
+                    start = time.perf_counter()
+                    decode(data)
+                    decode_times.append(time.perf_counter() - start)
+                print(
+                    f"{rows:>9,} rows {table_name:>11} {name:>7}: {len(data) / 2**10:10.1f} KiB, "
+                    f"encode {statistics.median(encode_times) * 1000:7.1f} ms CPU, "
+                    f"decode {statistics.median(decode_times) * 1000:6.1f} ms"
+                )
+    return 0
+
+
+def bench_cdc(args):
+    import io
+
+    import numpy as np
+    import pandas as pd
+
+    from cdc import IncrementalTable
+
+    rng = np.random.default_rng(0)
+    source = pd.DataFrame(
+        {
+            "key": np.arange(args.rows),
+            "value": rng.random(args.rows),
+            "updated": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(args.rows), unit="s"),
+        }
+    )
+    # A full reload reads the whole table, here from Parquet. The incremental
+    # source only returns the changed rows, like an indexed query would.
+    parquet = source.to_parquet()
+    changes = source.sample(args.changed, random_state=0)
+    table = IncrementalTable(
+        source.copy(), key="key", updated="updated", fetch_changes=lambda watermark: changes, poll_interval=0
+    )
+
+    full, incremental, after_snapshot = [], [], []
+    for i in range(args.repeat * 2):
+        changes = changes.assign(
+            value=rng.random(args.changed),
+            updated=source["updated"].max() + pd.Timedelta(seconds=i + 1),
+        )
+        if i % 2:
+            start = time.perf_counter()
+            pd.read_parquet(io.BytesIO(parquet))
+            full.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            table.refresh()
+            incremental.append((time.perf_counter() - start) * 1000)
+        else:
+            # A reader holds the changed column, so the refresh copies it.
+            table.snapshot()
+            start = time.perf_counter()
+            table.refresh()
+            after_snapshot.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{args.rows:,} rows, {args.changed:,} changed: full reload {statistics.median(full):.1f} ms, "
+        f"incremental refresh {statistics.median(incremental):.1f} ms "
+        f"({statistics.median(after_snapshot):.1f} ms after a snapshot)"
+    )
+    return 0
+
+
+def bench_animation(args):
+    import plotly.express as px
+    import plotly.io as pio
+
+    from animation import animated_scatter
+
+    df = px.data.gapminder()
+    kwargs = dict(
+        x="gdpPercap", y="lifeExp", size="pop", color="continent", hover_name="country", log_x=True, size_max=60
+    )
+    builders = {
+        "px.scatter": lambda: px.scatter(
+            df, animation_frame="year", animation_group="country", range_x=[100, 100_000], range_y=[25, 90], **kwargs
+        ),
+        "animated_scatter": lambda: animated_scatter(df, frame="year", group="country", **kwargs),
+    }
+    for name, build in builders.items():
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fig = build()
+            times.append((time.perf_counter() - start) * 1000)
+        payload = len(pio.to_json(fig, validate=False))
+        print(f"{name:>16}: build {statistics.median(times):6.0f} ms, payload {payload / 2**10:6.1f} KiB")
+    return 0
+
+
+def bench_dtypes(args):
+    import inspect
+
+    import plotly.express as px
+
+    import dashboard_data
+    import data
+    from arrow_ipc import to_ipc
+    from dtypes import compact
+
+    loaders = [
+        dashboard_data.performance_controls,
+        dashboard_data.regional_markets,
+        dashboard_data.performance_scores,
+        dashboard_data.performance_trend,
+        dashboard_data.underperforming_products,
+        dashboard_data.performance_history,
+        dashboard_data.market_share_trend,
+        dashboard_data.competitive_analysis,
+    ]
+    # The undecorated loaders return the frames as they were before compaction.
+    frames = {"data.df": data.df, "gapminder": px.data.gapminder()}
+    frames.update({load.__name__: inspect.unwrap(load)() for load in loaders})
+
+    totals = [0, 0, 0, 0]
+    print(f"{'':26} {'memory before':>14} {'after':>8} {'Arrow before':>13} {'after':>8}")
+    for name, frame in frames.items():
+        compacted = compact(frame)
+        sizes = [
+            int(frame.memory_usage(deep=True).sum()),
+            int(compacted.memory_usage(deep=True).sum()),
+            len(to_ipc(frame, compression=None)),
+            len(to_ipc(compacted, compression=None)),
+        ]
+        totals = [total + size for total, size in zip(totals, sizes)]
+        print(f"{name:26} " + " ".join(f"{size:{width}}" for size, width in zip(sizes, [14, 8, 13, 8])))
+    print(f"{'total':26} " + " ".join(f"{size:{width}}" for size, width in zip(totals, [14, 8, 13, 8])))
+    print(f"saved {totals[0] - totals[1]} bytes of memory and {totals[2] - totals[3]} bytes of Arrow payload")
+    return 0
+
+
+def badge_loop(fields):
+    import streamlit as st
+
+    with st.container(horizontal=True):
+        for i in range(fields):
+            with st.container(gap=None, width=160):
+                st.write(f"**FIELD {i}**")
+                st.badge(f"Value {i}", icon=":material/label:", color="blue")
+
+
+def badge_grid_script(fields):
+    from badges import badge_grid
+
+    badge_grid([(f"FIELD {i}", f"Value {i}", ":material/label:", "blue") for i in range(fields)])
+
+
+def tabs_script(lazy, work_ms):
+    import time
+
+    import streamlit as st
+
+    labels = ["One", "Two", "Three", "Four"]
+    tabs = st.tabs(labels, key="tabs", on_change="rerun" if lazy else "ignore")
+    for label, tab in zip(labels, tabs):
+        # `open` is None for tabs that don't track state, i.e. all bodies run.
+        if tab.open is False:
+            continue
+        with tab:
+            # Stands in for the queries behind a tab.
+            time.sleep(work_ms / 1000)
+            with st.container(horizontal=True):
+                for i in range(3):
+                    st.button(f"{label} {i}")
+
+
+def bench_tabs(args):
+    from streamlit.testing.v1 import AppTest
+
+    for work_ms in args.work_ms:
+        for name, lazy in [("eager", False), ("lazy", True)]:
+            at = AppTest.from_function(tabs_script, args=(lazy, work_ms), default_timeout=60)
+            at.run()
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                at.run()
+                times.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{work_ms:4} ms per tab, {name:>5}: {element_count(at.main):3} elements, "
+                f"rerun {statistics.median(times):6.1f} ms"
+            )
+    return 0
+
+
+def element_count(node):
+    return len(getattr(node, "children", {})) + sum(
+        element_count(child) for child in getattr(node, "children", {}).values()
+    )
+
+
+def bench_badges(args):
+    from streamlit.testing.v1 import AppTest
+
+    for fields in args.fields:
+        for name, script in [("st.badge loop", badge_loop), ("badge_grid", badge_grid_script)]:
+            at = AppTest.from_function(script, args=(fields,), default_timeout=60)
+            at.run()
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                at.run()
+                times.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{fields:4} fields, {name:>13}: {element_count(at.main):5} elements, "
+                f"{payload_bytes(at.main) / 2**10:6.1f} KiB, rerun {statistics.median(times):6.1f} ms"
+            )
+    return 0
+
+
+def payload_bytes(node):
+    """Serialized size of an AppTest element and everything inside it."""
+    size = node.proto.ByteSize() if getattr(node, "proto", None) is not None else 0
+    return size + sum(payload_bytes(child) for child in getattr(node, "children", {}).values())
+
+
+def measure_rerun(at, rerun, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rerun()
+        times.append((time.perf_counter() - start) * 1000)
+        check(at)
+    # Measured separately, because tracing slows everything down.
+    tracemalloc.start()
+    rerun()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    check(at)
+    return {
+        "rerun_ms": statistics.median(times),
+        "peak_mib": peak / 2**20,
+        "payload_kib": (payload_bytes(at.main) + payload_bytes(at.sidebar)) / 2**10,
+    }
+
+
+def measure_data_module(repeat):
+    import importlib
+
+    from streamlit import dataframe_util
+
+    import data
+
+    times = []
+    tracemalloc.start()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        importlib.reload(data)
+        times.append((time.perf_counter() - start) * 1000)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "rerun_ms": statistics.median(times),
+        "peak_mib": peak / 2**20,
+        # What `st.dataframe(df)` sends.
+        "payload_kib": len(dataframe_util.convert_pandas_df_to_arrow_bytes(data.df)) / 2**10,
+    }
+
+
+def bench_pages(args):
+    from streamlit.testing.v1 import AppTest
+
+    results = {"data.py": measure_data_module(args.repeat)}
+    with anonymous_user():
+        for page, (label, views) in PAGE_VIEWS.items():
+            at = check(AppTest.from_file(str(ROOT / page), default_timeout=60).run())
+            for view in views:
+                control = next(w for w in at.segmented_control if w.label == label)
+                # The first run fills the caches, like any earlier visitor would have.
+                check(control.set_value(view).run())
+                results[f"{page} / {view}"] = measure_rerun(at, at.run, args.repeat)
+
+    # Compare with the median of recent runs, which is less noisy than the last one.
+    history = read_history(args.history)[-args.baseline_runs :]
+    regressions = 0
+    print(f"{'':40} {'rerun ms':>10} {'peak MiB':>10} {'payload KiB':>12}")
+    for name, metrics in results.items():
+        cells = []
+        for metric, value in metrics.items():
+            past = [run["results"][name][metric] for run in history if name in run["results"]]
+            baseline = statistics.median(past) if past else None
+            worse = baseline is not None and value > baseline * (1 + args.threshold)
+            regressions += worse
+            cells.append(f"{value:{10 if metric != 'payload_kib' else 12}.1f}{'!' if worse else ' '}")
+        print(f"{name:40} " + " ".join(cells))
+
+    if not args.no_save:
+        append_history(args.history, results)
+
+    if regressions:
+        print(f"{regressions} metrics regressed by more than {args.threshold:.0%} (marked with !)")
+    return 1 if regressions else 0
+
+
+def anonymous_user():
+    """Run AppTests as a visitor who isn't logged in.
+
+    AppTest has no `[auth]` secrets, so `st.user.is_logged_in` would raise and
+    stop the home page at its login section.
+    """
+    from unittest import mock
+
+    return mock.patch("streamlit.user_info.get_secrets_auth_section", return_value={"enabled": True})
+
+
+def components_scanned_once():
+    """Reuse one scan of the installed packages' component manifests.
+
+    Each AppTest runs a new `Runtime`, which scans them again in a thread pool.
+    That interns the path of every file of every package, and the table it
+    interns them in grows now and then: a step of megabytes that's no leak.
+    """
+    from unittest import mock
+
+    from streamlit.components.v2 import manifest_scanner
+
+    manifests = manifest_scanner.scan_component_manifests()
+    return mock.patch.object(manifest_scanner, "scan_component_manifests", return_value=manifests)
+
+
+def check(at):
+    if at.exception:
+        raise RuntimeError(f"The app raised an exception:\n{at.exception[0].value}")
+    return at
+
+
+def simulate_session():
+    from streamlit.testing.v1 import AppTest
+
+    at = check(AppTest.from_file(str(ROOT / "streamlit_app.py"), default_timeout=60).run())
+    for label, options in [("Selection examples", ["Dataframe", "Map", "Chart"])]:
+        for option in options:
+            check(next(w for w in at.segmented_control if w.label == label).set_value(option).run())
+    check(at.switch_page("dashboard.py").run())
+    for option in ["Product Metrics", "Market Trends", "Performance Overview"]:
+        check(next(w for w in at.segmented_control if w.label == "View").set_value(option).run())
+
+
+def traced_memory():
+    # Prefetch and warm-up threads of earlier sessions may still be allocating.
+    # All their executors are shut down, so the threads end once they're done.
+    for thread in threading.enumerate():
+        if thread.name.startswith(("loader", "prefetch", "warmup")):
+            thread.join()
+    # Finalizers that a collection runs can free more garbage for the next one.
+    while gc.collect():
+        pass
+    return tracemalloc.get_traced_memory()[0]
+
+
+def bench_sessions(args):
+    with anonymous_user(), components_scanned_once():
+        tracemalloc.start()
+        # Warm-up sessions fill the global caches, which is expected growth.
+        for _ in range(args.warmup):
+            simulate_session()
+        baseline = traced_memory()
+
+        for i in range(args.sessions):
+            simulate_session()
+            if (i + 1) % max(args.sessions // 5, 1) == 0:
+                print(f"{i + 1:4d} sessions: {(traced_memory() - baseline) / 2**20:+.2f} MiB")
+        growth = (traced_memory() - baseline) / args.sessions
+        tracemalloc.stop()
+
+    leaking = growth > args.max_growth_kib * 1024
+    print(
+        f"Growth per session: {growth / 1024:.1f} KiB "
+        f"(limit {args.max_growth_kib} KiB) {'LEAK' if leaking else 'ok'}"
+    )
+    return 1 if leaking else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    imports = subparsers.add_parser("imports", help="Cold-start import time per page")
+    imports.add_argument("--repeat", type=int, default=5)
+    imports.add_argument("--top", type=int, default=10, help="Modules to show per page")
+    imports.add_argument("--threshold", type=float, default=0.1, help="Allowed relative regression")
+    imports.add_argument("--baseline-runs", type=int, default=5, help="Past runs to compare against")
+    imports.add_argument("--history", type=Path, default=IMPORTS_HISTORY_PATH)
+    imports.add_argument("--no-save", action="store_true", help="Don't add this run to the history")
+    imports.set_defaults(func=bench_imports)
+
+    fcp = subparsers.add_parser("fcp", help="First-contentful-paint of a running app")
+    fcp.add_argument("--url", default="http://localhost:8501")
+    fcp.add_argument("--repeat", type=int, default=5)
+    fcp.set_defaults(func=bench_fcp)
+
+    search = subparsers.add_parser("search", help="Typeahead search index latency")
+    search.add_argument("--size", type=int, default=1_000_000)
+    search.add_argument("--queries", type=int, default=1000)
+    search.add_argument("--limit", type=int, default=10)
+    search.set_defaults(func=bench_search)
+
+    styling = subparsers.add_parser("styling", help="Status color-coding cost")
+    styling.add_argument("--rows", type=int, default=100_000)
+    styling.set_defaults(func=bench_styling)
+
+    cache = subparsers.add_parser("cache", help="In-process vs. shared cache hit latency")
+    cache.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    cache.add_argument("--repeat", type=int, default=20)
+    cache.set_defaults(func=bench_cache)
+
+    selection = subparsers.add_parser("selection", help="Raw vs. compact selection payloads")
+    selection.add_argument("--points", type=int, default=1_000_000)
+    selection.set_defaults(func=bench_selection)
+
+    transport = subparsers.add_parser("transport", help="Compressed Arrow payload sizes")
+    transport.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    transport.add_argument("--repeat", type=int, default=3)
+    transport.set_defaults(func=bench_transport)
+
+    cdc = subparsers.add_parser("cdc", help="Full reload vs. incremental refresh")
+    cdc.add_argument("--rows", type=int, default=1_000_000)
+    cdc.add_argument("--changed", type=int, default=100)
+    cdc.add_argument("--repeat", type=int, default=10)
+    cdc.set_defaults(func=bench_cdc)
+
+    animation = subparsers.add_parser("animation", help="Gapminder animation build time and size")
+    animation.add_argument("--repeat", type=int, default=5)
+    animation.set_defaults(func=bench_animation)
+
+    badges = subparsers.add_parser("badges", help="Badge loop vs. badge grid")
+    badges.add_argument("--fields", type=int, nargs="+", default=[12, 300])
+    badges.add_argument("--repeat", type=int, default=10)
+    badges.set_defaults(func=bench_badges)
+
+    tabs = subparsers.add_parser("tabs", help="Eager vs. lazy tab bodies")
+    tabs.add_argument("--work-ms", type=int, nargs="+", default=[0, 100], help="Work per tab body")
+    tabs.add_argument("--repeat", type=int, default=5)
+    tabs.set_defaults(func=bench_tabs)
+
+    dtypes = subparsers.add_parser("dtypes", help="Bytes saved by compacting dtypes")
+    dtypes.set_defaults(func=bench_dtypes)
+
+    pages = subparsers.add_parser("pages", help="Rerun time, memory and payload per page and view")
+    pages.add_argument("--repeat", type=int, default=5)
+    pages.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression")
+    pages.add_argument("--baseline-runs", type=int, default=5, help="Past runs to compare against")
+    pages.add_argument("--history", type=Path, default=PAGES_HISTORY_PATH)
+    pages.add_argument("--no-save", action="store_true", help="Don't add this run to the history")
+    pages.set_defaults(func=bench_pages)
+
+    sessions = subparsers.add_parser("sessions", help="Memory leaks across simulated sessions")
+    sessions.add_argument("--sessions", type=int, default=20)
+    sessions.add_argument("--warmup", type=int, default=3)
+    sessions.add_argument("--max-growth-kib", type=float, default=64)
+    sessions.set_defaults(func=bench_sessions)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
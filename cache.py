@@ -0,0 +1,355 @@
+"""Caching helpers that go beyond `st.cache_data` and `st.cache_resource`."""
+
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from arrow_ipc import from_ipc, to_ipc
+
+# Memory quota per user. Least recently used results are evicted beyond this.
+USER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Memory quota of all users' caches together. Beyond it, the caches of the least
+# recently active users are dropped.
+USER_CACHES_MAX_BYTES = 1024 * 1024 * 1024
+# Caches of users who haven't used them for this long are dropped.
+USER_CACHE_IDLE_SECONDS = 60 * 60
+
+# Shared cache used by `shared_cache`. Set CACHE_REDIS_URL to use Redis instead.
+SHARED_CACHE_PATH = Path(__file__).parent / ".cache" / "shared.sqlite"
+
+_LOGGER = logging.getLogger(__name__)
+
+# Key prefix of the current version of each `shared_cache` function, by namespace.
+_SHARED_KEYS = {}
+
+# Functions and argument tuples registered with `prewarm`.
+_PREWARM = []
+
+
+def nbytes(value):
+    """Estimate how much memory a cached value holds."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return sys.getsizeof(value)
+
+
+def args_hash(args, kwargs):
+    payload = pickle.dumps((args, sorted(kwargs.items())), protocol=pickle.HIGHEST_PROTOCOL)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def source_hash(func):
+    """Hash of `func`'s source code, so editing a cached function invalidates it."""
+    try:
+        source = inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        source = func.__code__.co_code
+    return hashlib.sha256(source).hexdigest()[:16]
+
+
+class UserCache:
+    """A thread-safe LRU cache that evicts entries beyond `max_bytes`."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.used_at = time.monotonic()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            self.used_at = time.monotonic()
+            value, _ = self._entries[key]
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = nbytes(value)
+        if size > self.max_bytes:
+            # Caching this would evict everything else and still not fit.
+            return
+        with self._lock:
+            self.used_at = time.monotonic()
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            while self._entries and self.size + size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+            self._entries[key] = (value, size)
+            self.size += size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+@st.cache_resource
+def _user_caches():
+    # Shared by all sessions of this server process, keyed by user email, least
+    # recently active user first.
+    return OrderedDict(), threading.Lock()
+
+
+def _evict_users(caches, keep):
+    """Drop idle users' caches, then the least recently active ones until all
+    caches together fit `USER_CACHES_MAX_BYTES`. The cache of `keep` stays."""
+    now = time.monotonic()
+    for email, user_cache in list(caches.items()):
+        if email != keep and now - user_cache.used_at > USER_CACHE_IDLE_SECONDS:
+            del caches[email]
+    total = sum(user_cache.size for user_cache in caches.values())
+    for email in list(caches):
+        if total <= USER_CACHES_MAX_BYTES:
+            break
+        if email != keep:
+            total -= caches.pop(email).size
+
+
+def user_cache_sizes():
+    """Bytes held by each logged-in user's cache in this server process."""
+    caches, lock = _user_caches()
+    with lock:
+        return {email: user_cache.size for email, user_cache in caches.items()}
+
+
+def current_user_cache():
+    """Return the cache of the logged-in user.
+
+    Anonymous users get a cache that lives in their session, so results never
+    leak between different visitors. Other users' caches are evicted here, so
+    all of them together hold at most `USER_CACHES_MAX_BYTES` plus one user's
+    quota.
+    """
+    if st.user.get("is_logged_in") and st.user.get("email"):
+        email = st.user.email
+        caches, lock = _user_caches()
+        with lock:
+            if email not in caches:
+                caches[email] = UserCache(USER_CACHE_MAX_BYTES)
+            caches.move_to_end(email)
+            _evict_users(caches, keep=email)
+            return caches[email]
+
+    if "_user_cache" not in st.session_state:
+        st.session_state._user_cache = UserCache(USER_CACHE_MAX_BYTES)
+    return st.session_state._user_cache
+
+
+def user_cache(func):
+    """Cache `func`'s results per logged-in user (`st.user.email`).
+
+    Unlike `st.cache_data`, results are only visible to the user that computed
+    them, but they survive page switches, reconnects and multiple tabs. Results
+    are returned without copying, so don't mutate them.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        cache = current_user_cache()
+        key = (func.__module__, func.__qualname__, args_hash(args, kwargs))
+        try:
+            return cache.get(key)
+        except KeyError:
+            pass
+        value = func(*args, **kwargs)
+        cache.set(key, value)
+        return value
+
+    return wrapper
+
+
+def serialize(value):
+    """Serialize a cached value, DataFrames as (compressed) Arrow IPC and anything
+    else pickled."""
+    if isinstance(value, pd.DataFrame):
+        return b"A" + to_ipc(value)
+    return b"P" + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def deserialize(data):
+    if data[:1] == b"A":
+        return from_ipc(memoryview(data)[1:])
+    return pickle.loads(memoryview(data)[1:])
+
+
+class SqliteBackend:
+    """Key-value store in a SQLite file, shared by all processes on this host.
+
+    It mirrors the subset of the redis-py API that `shared_cache` uses (`get`,
+    `set` with `ex`, `delete`, `scan_iter`, `flushdb`), so it can stand in for Redis locally
+    and a `redis.Redis` client can replace it without code changes.
+    """
+
+    def __init__(self, path=SHARED_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+
+    def _connection(self):
+        # SQLite connections can't be shared between threads.
+        if not hasattr(self._local, "connection"):
+            connection = sqlite3.connect(self.path, timeout=30)
+            # WAL lets readers in other processes proceed while one writes.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return self._local.connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return row[0]
+
+    def set(self, key, value, ex=None):
+        expires_at = time.time() + ex if ex is not None else None
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (key, value, expires_at)
+            )
+
+    def delete(self, *keys):
+        with self._connection() as connection:
+            connection.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+
+    def scan_iter(self, match="*"):
+        # SQLite's GLOB uses the same wildcards as Redis' MATCH.
+        rows = self._connection().execute("SELECT key FROM cache WHERE key GLOB ?", (match,))
+        return [key for key, in rows]
+
+    def flushdb(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache")
+
+
+@st.cache_resource
+def shared_backend():
+    if os.environ.get("CACHE_REDIS_URL"):
+        import redis
+
+        return redis.Redis.from_url(os.environ["CACHE_REDIS_URL"])
+    return SqliteBackend()
+
+
+def shared_cache(func=None, *, ttl=None, version=0, backend=None):
+    """Cache `func`'s results in a store shared by all server processes.
+
+    Stack it under `st.cache_data` so repeated calls within a process are
+    served from memory and only misses go to the shared store:
+
+        @st.cache_data
+        @shared_cache
+        def load(...): ...
+
+    The SQLite store lives on disk, so results survive restarts. Keys include a
+    hash of `func`'s source, so editing it invalidates old results. Bump
+    `version` to invalidate them when something else changed, e.g. the data
+    `func` reads. `prune_stale` deletes the old entries.
+
+    `ttl` is in seconds. `backend` defaults to `shared_backend()`.
+    """
+    if func is None:
+        return functools.partial(shared_cache, ttl=ttl, version=version, backend=backend)
+
+    namespace = f"{func.__module__}.{func.__qualname__}:"
+    prefix = f"{namespace}v{version}:{source_hash(func)}:"
+    _SHARED_KEYS[namespace] = (prefix, backend)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        store = backend or shared_backend()
+        key = prefix + args_hash(args, kwargs)
+        data = store.get(key)
+        if data is not None:
+            return deserialize(data)
+        value = func(*args, **kwargs)
+        store.set(key, serialize(value), ex=ttl)
+        return value
+
+    return wrapper
+
+
+def prune_stale():
+    """Delete shared cache entries of old versions of `shared_cache` functions."""
+    for namespace, (prefix, backend) in _SHARED_KEYS.items():
+        store = backend or shared_backend()
+        stale = [
+            key
+            for key in store.scan_iter(match=namespace + "*")
+            if not (key.decode() if isinstance(key, bytes) else key).startswith(prefix)
+        ]
+        if stale:
+            store.delete(*stale)
+
+
+def prewarm(*calls):
+    """Register the decorated function to be called at startup by `run_prewarm`.
+
+    Each of `calls` is a tuple of positional arguments, e.g. popular slider
+    values. Without `calls`, it's called once without arguments. Put it above
+    `st.cache_data` so the in-memory cache is warmed too:
+
+        @prewarm((100,), (500,))
+        @st.cache_data
+        @shared_cache
+        def compute(size): ...
+    """
+
+    def decorator(func):
+        _PREWARM.append((func, calls or [()]))
+        return func
+
+    return decorator
+
+
+def run_prewarm():
+    """Delete stale entries, then call every `prewarm` function.
+
+    Results already in the shared store are only loaded into memory, so after a
+    restart this is fast. Run it before the server accepts traffic, e.g. in an
+    `st.App` lifespan.
+    """
+    prune_stale()
+    for func, calls in _PREWARM:
+        for args in calls:
+            start = time.perf_counter()
+            try:
+                func(*args)
+            except Exception:
+                _LOGGER.exception("Prewarming %s%r failed", func.__qualname__, args)
+                continue
+            _LOGGER.info(
+                "Prewarmed %s%r in %.0f ms",
+                func.__qualname__,
+                args,
+                (time.perf_counter() - start) * 1000,
+            )
@@ -0,0 +1,133 @@
+"""Incremental refresh of a table from its source (change data capture).
+
+Instead of reloading the whole table, `IncrementalTable.refresh` asks the source
+only for rows modified after the newest timestamp it has seen (the watermark)
+and upserts them by key, so a refresh costs O(changed rows), plus a copy of
+each column it changes that a reader may still hold.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _fitting_dtype(dtype, values):
+    """`dtype`, widened if needed to also hold `values`.
+
+    Compact columns (see dtypes.py) may not fit updates, e.g. a new category or
+    a larger number.
+    """
+    if isinstance(dtype, pd.CategoricalDtype):
+        new = pd.Index(values.dropna().unique()).difference(dtype.categories)
+        return pd.CategoricalDtype(dtype.categories.append(new), dtype.ordered) if len(new) else dtype
+    numeric = pd.api.types.is_numeric_dtype
+    if values.dtype == dtype or not (numeric(dtype) and numeric(values.dtype)):
+        return dtype
+    try:
+        fits = ((values.astype(dtype) == values) | values.isna()).all()
+    except (TypeError, ValueError, OverflowError):
+        fits = False
+    return dtype if fits else np.result_type(dtype, values.dtype)
+
+
+class IncrementalTable:
+    """A DataFrame kept up to date from `fetch_changes(watermark)`.
+
+    `fetch_changes` returns the rows whose `updated` column is newer than
+    `watermark`, e.g. via `SELECT * FROM t WHERE updated > :watermark` on an
+    indexed column. Rows are matched by their `key` column. `derived` maps a
+    name to a function computing row-aligned arrays from rows (e.g. encoded
+    tags), which are updated along with the rows they belong to.
+    """
+
+    def __init__(self, frame, key, updated, fetch_changes, derived=None, poll_interval=1.0):
+        self.key = key
+        self.updated = updated
+        self.poll_interval = poll_interval
+        self._fetch_changes = fetch_changes
+        self._frame = frame.reset_index(drop=True)
+        self._positions = pd.Index(self._frame[key])
+        self._derive = derived or {}
+        self._derived = {name: derive(self._frame) for name, derive in self._derive.items()}
+        self.watermark = self._frame[updated].max()
+        self._polled_at = 0.0
+        self._lock = threading.Lock()
+        # Columns and derived arrays copied since the last snapshot, which no
+        # reader holds and which can be updated in place.
+        self._owned = set()
+
+    def snapshot(self):
+        """The current rows and derived arrays.
+
+        Refreshes never write to a column or array a reader may hold. The first
+        refresh that changes one after a snapshot copies it, later ones update
+        the copy in place, so a snapshot doesn't change under its reader.
+        """
+        with self._lock:
+            self._owned.clear()
+            return self._frame.copy(deep=False), dict(self._derived)
+
+    def refresh(self):
+        """Fetch and upsert rows changed since the watermark. Returns them.
+
+        Calls within `poll_interval` seconds of the last poll, e.g. from other
+        sessions, don't hit the source again.
+        """
+        with self._lock:
+            if time.monotonic() - self._polled_at < self.poll_interval:
+                return self._frame.iloc[:0]
+            self._polled_at = time.monotonic()
+            changes = self._fetch_changes(self.watermark)
+            if len(changes):
+                self._upsert(changes.reset_index(drop=True))
+                self.watermark = max(self.watermark, changes[self.updated].max())
+            return changes
+
+    def _upsert(self, changes):
+        changes = changes.drop_duplicates(self.key, keep="last").reset_index(drop=True)
+        dtypes = {column: _fitting_dtype(dtype, changes[column]) for column, dtype in self._frame.dtypes.items()}
+        widened = [column for column, dtype in dtypes.items() if dtype != self._frame[column].dtype]
+        if widened:
+            self._frame = self._frame.astype({column: dtypes[column] for column in widened})
+            self._owned.update(widened)
+        # With the frame's dtypes, updated and added rows keep them.
+        changes = changes.astype(dtypes)
+        positions = self._positions.get_indexer(changes[self.key])
+        existing = positions >= 0
+        derived = {name: derive(changes) for name, derive in self._derive.items()}
+
+        if existing.any():
+            rows = positions[existing]
+            updates = changes[existing].reset_index(drop=True)
+            changed = [
+                column
+                for column in self._frame.columns
+                if not self._frame[column].iloc[rows].reset_index(drop=True).equals(updates[column])
+            ]
+            shared = [column for column in changed if column not in self._owned]
+            if shared:
+                frame = self._frame.copy(deep=False)
+                for column in shared:
+                    frame[column] = frame[column].copy()
+                self._frame = frame
+                self._owned.update(shared)
+            for column in changed:
+                self._frame.iloc[rows, self._frame.columns.get_loc(column)] = updates[column].to_numpy()
+            for name, values in derived.items():
+                if np.array_equal(self._derived[name][rows], values[existing]):
+                    continue
+                if name not in self._owned:
+                    self._derived[name] = self._derived[name].copy()
+                    self._owned.add(name)
+                self._derived[name][rows] = values[existing]
+
+        if not existing.all():
+            added = changes[~existing]
+            self._frame = pd.concat([self._frame, added], ignore_index=True)
+            self._positions = self._positions.append(pd.Index(added[self.key]))
+            for name, values in derived.items():
+                self._derived[name] = np.concatenate([self._derived[name], values[~existing]])
+            # Both are new, so no reader holds them.
+            self._owned.update([*self._frame.columns, *self._derived])
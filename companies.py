@@ -0,0 +1,47 @@
+"""The company table of the home page, kept up to date with `cdc.IncrementalTable`."""
+
+import datetime
+
+import numpy as np
+import streamlit as st
+
+from cdc import IncrementalTable
+from data import df, tag_options
+from dtypes import compact
+from tags import encode_tags
+
+REFRESH_SECONDS = 5
+
+
+class SimulatedSource:
+    """Stand-in for the database table behind `data.df`.
+
+    Every poll, a few companies get a new stock price and `Last Updated`.
+    """
+
+    def __init__(self, frame, seed=0):
+        self._frame = frame.copy()
+        self._rng = np.random.default_rng(seed)
+
+    def changes_since(self, watermark):
+        rows = self._rng.choice(len(self._frame), size=self._rng.integers(0, 3), replace=False)
+        now = max(datetime.datetime.now(), watermark + datetime.timedelta(microseconds=1))
+        prices = self._frame.loc[rows, "Stock Price"] * self._rng.normal(1, 0.01, len(rows))
+        self._frame.loc[rows, "Stock Price"] = prices.round(2)
+        self._frame.loc[rows, "Last Updated"] = now
+        # A database would answer this from an index on "Last Updated".
+        return self._frame[self._frame["Last Updated"] > watermark]
+
+
+@st.cache_resource
+def company_table():
+    # Shared by all sessions. Tag masks are kept in sync with the rows, so tag
+    # filtering stays a bitwise op.
+    frame = compact(df)
+    return IncrementalTable(
+        frame,
+        key="Company Name",
+        updated="Last Updated",
+        fetch_changes=SimulatedSource(frame).changes_since,
+        derived={"tags": lambda rows: encode_tags(rows["Tags"], tag_options)},
+    )
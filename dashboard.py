@@ -1,35 +1,123 @@
 import datetime
 
-import numpy as np
 import pandas as pd
 import streamlit as st
 import altair as alt
 
+import dashboard_data
+from badges import badge_grid
+from export import download_links
+from kpi import KpiEngine
+from loading import ConcurrentLoader, session_prefetcher
+from search import SearchIndex
+from styling import colored_labels, labels_column
+
 
 st.set_page_config(page_title="Dashboard with flex layout", layout="wide")
-np.random.seed(42)
+
+# With a real catalogue these lists are far too big to embed in a selectbox, so
+# they are searched on the server and only the top matches are sent over.
+CATALOGUES = {
+    "kpis": ["Revenue Growth", "Customer Retention", "Product Quality"],
+    "metrics": ["All Metrics for KPI", "Monthly Revenue", "Quarterly Growth"],
+}
+
+STATUS_COLORS = {"On Track": "green", "At Risk": "orange", "Below Target": "red"}
+
+# Fields of the product overview, as (label, badge, icon, color).
+PRODUCT_DETAILS = [
+    ("REGION", "North America", ":material/globe:", "green"),
+    ("PRODUCT LINE", "Smart Devices", ":material/label:", "blue"),
+    ("PRODUCT CATEGORY", "IoT Sensors", ":material/label:", "blue"),
+    ("PRODUCT MANAGER", "Thompson, R&D-5", ":material/person:", "violet"),
+    ("MARKET ANALYST", "Chen, MKT-3", ":material/person:", "violet"),
+    ("DATA ANALYST", "Rivera, DATA-1", ":material/person:", "violet"),
+    ("REPORTING CYCLE", "Monthly", ":material/cycle:", "orange"),
+    ("SYSTEMS", "CRM", ":material/label:", "blue"),
+    ("TARGET MARKET", "Enterprise", ":material/label:", "blue"),
+    ("KEY REPORTS", "Sales Analysis", ":material/label:", "blue"),
+    ("DATA SOURCE", "Central Database", ":material/label:", "blue"),
+    ("TRACKING METHOD", "Automated", ":material/label:", "blue"),
+]
+
+
+@st.cache_resource
+def search_index(catalogue):
+    return SearchIndex(CATALOGUES[catalogue])
+
+
+@st.cache_resource
+def kpi_engine():
+    # Built once per server. New events go through `add`, which is O(1), so the
+    # metric cards render from running totals instead of scanning the facts.
+    engine = KpiEngine(dashboard_data.KPIS, dashboard_data.CURRENT_PERIOD, dashboard_data.PREVIOUS_PERIOD)
+    for event in dashboard_data.kpi_events():
+        engine.add(*event)
+    return engine
+
+
+@st.cache_data(show_spinner=False)
+def performance_controls():
+    stability_data = dashboard_data.performance_controls()
+    # Color-code the status with one vectorized lookup instead of a Styler.
+    stability_data["Status"] = colored_labels(stability_data["Status"], STATUS_COLORS)
+    return stability_data
+
+
+# Data loaded by each view. The views that aren't shown are prefetched.
+VIEW_LOADERS = {
+    "Performance Overview": [
+        dashboard_data.performance_scores,
+        dashboard_data.performance_trend,
+        performance_controls,
+    ],
+    "Product Metrics": [
+        dashboard_data.underperforming_products,
+        dashboard_data.performance_history,
+    ],
+    "Market Trends": [
+        dashboard_data.market_share_trend,
+        dashboard_data.competitive_analysis,
+        dashboard_data.regional_markets,
+    ],
+}
+
+
+def money(value):
+    for suffix, scale in [("B", 1e9), ("M", 1e6), ("K", 1e3)]:
+        if abs(value) >= scale:
+            return f"${value / scale:.1f}{suffix}"
+    return f"${value:,.0f}"
+
+
+def signed(delta, spec):
+    # Without a previous value there's no delta, and st.metric shows none.
+    return None if delta is None else f"{delta:+{spec}}"
+
+
+@st.fragment
+def search_box(label, catalogue):
+    # Typing only reruns this fragment, debounced by `live`.
+    with st.container(gap=None, width=200):
+        query = st.text_input(label, type="search", live="300ms", placeholder="Type to search")
+        st.selectbox(label, search_index(catalogue).search(query), label_visibility="collapsed")
 
 
 with st.container(horizontal=True, vertical_alignment="bottom"):
     st.header("Dashboard with flex layout", width="stretch")
 
-    st.selectbox(
+    filter_by = st.selectbox(
         "Filter by", ["Product Line", "Metrics", "Reports", "Department", "Region", "Category"], width=150
     )
-    st.selectbox(
-        "Search for KPIs",
-        ["Revenue Growth", "Customer Retention", "Product Quality"],
-        width=200
-    )
-    st.selectbox(
-        "Search for Metrics",
-        [
-            "All Metrics for KPI",
-            "Monthly Revenue",
-            "Quarterly Growth",
-        ],
-        width=200
-    )
+    search_box("Search for KPIs", "kpis")
+    search_box("Search for Metrics", "metrics")
+
+kpis = kpi_engine()
+
+# The sections below only reserve their place; their data loads concurrently and
+# each one is drawn as soon as its data is ready, at the end of the script.
+prefetcher = session_prefetcher(key=filter_by)
+loader = ConcurrentLoader(prefetcher=prefetcher)
 
 view = st.segmented_control(
     "View",
@@ -44,10 +132,10 @@ if view == "Performance Overview":
     
     # Add top row metrics with deltas
     with st.container(horizontal=True):
-        st.metric("Total Revenue", "$5.8M", delta="+12.4%", width="stretch", border=True)
-        st.metric("Active Products", "42", delta="+5", width="stretch", border=True)
-        st.metric("Customer Satisfaction", "8.7/10", delta="+0.3", width="stretch", border=True)
-        st.metric("YTD Growth", "18.2%", delta="+3.5%", width="stretch", border=True)
+        st.metric("Total Revenue", money(kpis.value("Total Revenue")), delta=signed(kpis.delta('Total Revenue', relative=True), ".1%"), width="stretch", border=True)
+        st.metric("Active Products", kpis.value("Active Products"), delta=signed(kpis.delta('Active Products'), "d"), width="stretch", border=True)
+        st.metric("Customer Satisfaction", f"{kpis.value('Customer Satisfaction'):.1f}/10", delta=signed(kpis.delta('Customer Satisfaction'), ".1f"), width="stretch", border=True)
+        st.metric("YTD Growth", f"{kpis.value('YTD Growth') - 1:.1%}", delta=signed(kpis.delta('YTD Growth'), ".1%"), width="stretch", border=True)
     
     col1, col2 = st.columns([2, 1])
     # TODO: height="stretch" is not working. 
@@ -60,27 +148,8 @@ if view == "Performance Overview":
         """)
 
         
-        # TODO: Need grid layout here. 
-        # TODO: Would be nice to set a bigger vertical gap once this wraps.
-        with st.container(horizontal=True):
-            
-            def show_element(text, badge_text, icon, color="blue"):
-                with st.container(gap=None, width=160): 
-                    st.write(f"**{text}**")
-                    st.badge(badge_text, icon=icon, color=color)
-
-            show_element("REGION", "North America", ":material/globe:", color="green")
-            show_element("PRODUCT LINE", "Smart Devices", ":material/label:")
-            show_element("PRODUCT CATEGORY", "IoT Sensors", ":material/label:")
-            show_element("PRODUCT MANAGER", "Thompson, R&D-5", ":material/person:", color="violet")
-            show_element("MARKET ANALYST", "Chen, MKT-3", ":material/person:", color="violet")
-            show_element("DATA ANALYST", "Rivera, DATA-1", ":material/person:", color="violet")
-            show_element("REPORTING CYCLE", "Monthly", ":material/cycle:", color="orange")
-            show_element("SYSTEMS", "CRM", ":material/label:")
-            show_element("TARGET MARKET", "Enterprise", ":material/label:")
-            show_element("KEY REPORTS", "Sales Analysis", ":material/label:")
-            show_element("DATA SOURCE", "Central Database", ":material/label:")
-            show_element("TRACKING METHOD", "Automated", ":material/label:")
+        # All fields render as one element, which wraps them in a grid.
+        badge_grid(PRODUCT_DETAILS)
         
         
            
@@ -90,110 +159,63 @@ if view == "Performance Overview":
             st.write(":small[Performance Score]")
             
             # Bar chart with multiple categories
-            score_data = pd.DataFrame({
-                "Category": ["A", "B", "C", "D"],
-                "Score": [72, 85, 65, 70]
-            })
-            
-            st.bar_chart(
-                score_data,
-                x="Category",
-                y="Score",
+            loader.slot(
+                dashboard_data.performance_scores,
+                lambda score_data: st.bar_chart(
+                    score_data,
+                    x="Category",
+                    y="Score",
+                    height=150,
+                    use_container_width=True
+                ),
                 height=150,
-                use_container_width=True
             )
             
         with st.container(border=True, height="stretch"):
             st.write(":small[Monthly Performance Trend]")
             
-            # Create more comprehensive data for line chart with multiple metrics
-            months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun"]
-            
-            trend_data = pd.DataFrame({
-                "Overall Score": [58, 60, 62, 65, 68, 72],
-                "Revenue": [55, 58, 64, 67, 72, 78],
-                "Customer Satisfaction": [65, 63, 60, 62, 65, 68]
-            }, index=months)
-            
             # Display simple line chart with multiple lines
-            st.line_chart(
-                trend_data,
+            loader.slot(
+                dashboard_data.performance_trend,
+                lambda trend_data: st.line_chart(
+                    trend_data,
+                    height=150,
+                    use_container_width=True
+                ),
                 height=150,
-                use_container_width=True
             )
 
     with st.container(border=True):
-        st.write(":small[Performance Controls]")
-        # Create sample data for the table
-        stability_data = pd.DataFrame({
-            "KPI Code": ["KPI-001", "KPI-002", "KPI-003", "KPI-004", "KPI-005", "KPI-006", "KPI-007", "KPI-008", "KPI-009", "KPI-010", "KPI-011", "KPI-012", "KPI-013", "KPI-014", "KPI-015", "KPI-016", "KPI-017", "KPI-018", "KPI-019", "KPI-020"],
-            "Performance Indicator": [
-                "Revenue Growth Rate",
-                "Customer Acquisition Cost",
-                "Customer Lifetime Value",
-                "Churn Rate",
-                "Net Promoter Score",
-                "Gross Margin",
-                "Operating Expense Ratio",
-                "Inventory Turnover",
-                "Days Sales Outstanding",
-                "Return on Investment",
-                "Market Share",
-                "Product Defect Rate",
-                "Employee Satisfaction",
-                "Website Conversion Rate",
-                "Average Order Value",
-                "Sales Cycle Length",
-                "Lead-to-Customer Ratio",
-                "Customer Support Resolution Time",
-                "Social Media Engagement",
-                "Supply Chain Efficiency"
-            ],
-            "Target Value": [
-                "15%", "80$", "450$", "5%", "45", "35%", "25%", "12", "30", "22%", 
-                "18%", "0.5%", "4.2/5", "3.5%", "120$", "14 days", "25%", "4h", "8%", "92%"
-            ],
-            "Status": [
-                "On Track", "At Risk", "On Track", "On Track", "Below Target", 
-                "On Track", "At Risk", "On Track", "Below Target", "On Track",
-                "On Track", "At Risk", "On Track", "On Track", "Below Target",
-                "On Track", "On Track", "At Risk", "On Track", "On Track"
-            ],
-            "Department": [
-                "Sales", "Marketing", "Sales", "Customer Success", "Customer Success",
-                "Finance", "Finance", "Operations", "Finance", "Executive",
-                "Marketing", "Production", "HR", "Marketing", "Sales",
-                "Sales", "Marketing", "Support", "Marketing", "Operations"
-            ],
-            "Review Frequency": [
-                "Monthly", "Quarterly", "Quarterly", "Monthly", "Quarterly",
-                "Monthly", "Monthly", "Weekly", "Monthly", "Quarterly",
-                "Quarterly", "Daily", "Quarterly", "Weekly", "Monthly",
-                "Monthly", "Monthly", "Daily", "Weekly", "Monthly"
-            ],
-        })
-        
+        with st.container(horizontal=True, vertical_alignment="center"):
+            st.write(":small[Performance Controls]")
+            download_links("performance_controls")
+
         # Display the dataframe
-        st.dataframe(
-            stability_data,
-            hide_index=True,
-            use_container_width=True,
-            column_config={
-                "Metric ID": st.column_config.TextColumn("Metric ID"),
-                "Metric Name": st.column_config.TextColumn("Metric Name"),
-                "Control ID": st.column_config.TextColumn("Control ID"),
-                "Control Name": st.column_config.TextColumn("Control Name"),
-                "Performance Dimension": st.column_config.TextColumn("Performance Dimension"),
-                "Critical Product Element": st.column_config.TextColumn("Critical Product Element")
-            }
+        loader.slot(
+            performance_controls,
+            lambda stability_data: st.dataframe(
+                stability_data,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Metric ID": st.column_config.TextColumn("Metric ID"),
+                    "Metric Name": st.column_config.TextColumn("Metric Name"),
+                    "Control ID": st.column_config.TextColumn("Control ID"),
+                    "Control Name": st.column_config.TextColumn("Control Name"),
+                    "Performance Dimension": st.column_config.TextColumn("Performance Dimension"),
+                    "Critical Product Element": st.column_config.TextColumn("Critical Product Element"),
+                    "Status": labels_column(STATUS_COLORS),
+                }
+            ),
+            height=400,
         )
 
 elif view == "Product Metrics":
 
     col1, col2, col3, col4 = st.columns([1, 1, 1, 2], border=True)
-    col1.metric("Total number of products", 5427, delta="+124")
-    col2.metric("Underperforming products", 18, delta="-3")
-    col3.metric("Overperforming products", 36, delta="+8")
+    col1.metric("Total number of products", kpis.value("Total Products"), delta=signed(kpis.delta('Total Products'), "d"))
+    col2.metric("Underperforming products", kpis.value("Underperforming Products"), delta=signed(kpis.delta('Underperforming Products'), "d"))
+    col3.metric("Overperforming products", kpis.value("Overperforming Products"), delta=signed(kpis.delta('Overperforming Products'), "d"))
 
     data = pd.DataFrame(
         {
@@ -247,42 +269,31 @@ elif view == "Product Metrics":
             st.markdown(":small[Show selected period by]", width="content")
             st.selectbox("Show selected period by", ["Year", "Quarter", "Month"], width=150, label_visibility="collapsed")
 
-        # Generate sample data
-        dates = pd.date_range(start="2023-06-01", end="2024-06-01", freq="D")
-        df = pd.DataFrame(
-            {
-                "Smart Home": np.random.randint(0, 20, size=10),
-                "Office IoT": np.random.randint(0, 20, size=10),
-                "Industrial Sensors": np.random.randint(0, 20, size=10),
-            },
-            index=pd.date_range(start="2023-06-01", end="2024-06-01", periods=10),
-        )
         # TODO: Would be great to set our color names here. Or alternatively define them
         # in advanced theming.
-        st.line_chart(df, height=300)
+        loader.slot(
+            dashboard_data.underperforming_products,
+            lambda df: st.line_chart(df, height=300),
+            height=300,
+        )
 
 
     with st.container(border=True):
         st.write(":small[Performance score over time]")
 
-        # Generate sample data
-        dates = pd.date_range(start="2023-06-01", end="2024-06-01", freq="D")
-        df = pd.DataFrame(
-            {
-                "Company Average": np.random.randint(0, 20, size=10),
-                "Product Line": np.random.randint(0, 20, size=10),
-            },
-            index=pd.date_range(start="2023-06-01", end="2024-06-01", periods=10),
+        loader.slot(
+            dashboard_data.performance_history,
+            lambda df: st.line_chart(df, height=300),
+            height=300,
         )
-        st.line_chart(df, height=300)
 
 elif view == "Market Trends":
     
     # Header metrics in columns
     col1, col2, col3, col4 = st.columns([1, 1, 1, 2], border=True)
-    col1.metric("Market Size", "$4.3B", delta="+8.2%")
-    col2.metric("Market Share", "23.5%", delta="+2.1%")
-    col3.metric("Competitors", "14", delta="-2")
+    col1.metric("Market Size", money(kpis.value("Market Size")), delta=signed(kpis.delta('Market Size', relative=True), ".1%"))
+    col2.metric("Market Share", f"{kpis.value('Market Share'):.1%}", delta=signed(kpis.delta('Market Share'), ".1%"))
+    col3.metric("Competitors", kpis.value("Competitors"), delta=signed(kpis.delta('Competitors'), "d"))
 
     data = pd.DataFrame(
         {
@@ -340,73 +351,53 @@ elif view == "Market Trends":
             st.markdown(":small[View by]", width="content")
             st.selectbox("View by", ["Quarter", "Month", "Year"], width=150, label_visibility="collapsed")
 
-        # Create market share trend data
-        quarters = ["Q1 2023", "Q2 2023", "Q3 2023", "Q4 2023", "Q1 2024", "Q2 2024"]
-        trend_data = pd.DataFrame({
-            "Our Company": [18.2, 19.5, 20.3, 21.8, 22.6, 23.5],
-            "Competitor A": [21.5, 20.8, 19.2, 18.8, 18.5, 18.2],
-            "Competitor B": [15.3, 14.8, 14.5, 14.0, 13.8, 13.6],
-            "Competitor C": [12.2, 12.5, 13.0, 13.2, 13.0, 12.8],
-            "Others": [32.8, 32.4, 33.0, 32.2, 32.1, 31.9]
-        }, index=quarters)
-        
-        st.line_chart(trend_data, height=300)
+        loader.slot(
+            dashboard_data.market_share_trend,
+            lambda trend_data: st.line_chart(trend_data, height=300),
+            height=300,
+        )
         
     # Market analysis and insights
     with col2:
         st.write(":small[Competitive Analysis]")
                 
         # Bar chart comparing key metrics against competitors
-        metrics = ["Price", "Quality", "Innovation", "Brand Value"]
-        companies = ["Our Company", "Competitor A", "Competitor B"]
-        
-        # Reshape data for grouped bar chart
-        market_data = []
-        for metric in metrics:
-            for company in companies:
-                if company == "Our Company":
-                    score = np.random.randint(70, 90)
-                elif company == "Competitor A":
-                    score = np.random.randint(65, 85)
-                else:
-                    score = np.random.randint(60, 80)
-                market_data.append({"Metric": metric, "Company": company, "Score": score})
-        
-        market_df = pd.DataFrame(market_data)
-        
-        # Group by Metric and pivot
-        pivot_df = market_df.pivot(index="Metric", columns="Company", values="Score")
-        
-        # Plot bar chart
-        st.bar_chart(pivot_df, height=270)
+        loader.slot(
+            dashboard_data.competitive_analysis,
+            lambda pivot_df: st.bar_chart(pivot_df, height=270),
+            height=270,
+        )
     
     # Bottom section for regional market data
     with st.container(border=True):
-        st.write(":small[Regional Market Analysis]")
-        
-        # Create sample data for regions
-        region_data = pd.DataFrame({
-            "Region": ["North America", "Europe", "Asia Pacific", "Latin America", "Middle East & Africa"],
-            "Market Size ($M)": [1850, 1200, 850, 250, 150],
-            "Growth Rate (%)": [7.2, 5.8, 12.5, 9.3, 6.7],
-            "Our Market Share (%)": [28.5, 22.0, 18.5, 15.0, 10.5],
-            "Competitors": [6, 8, 10, 5, 3],
-            "CAGR (3yr)": ["8.2%", "6.5%", "13.2%", "10.1%", "7.5%"],
-            "Market Trend": ["Growing", "Stable", "Rapidly Growing", "Growing", "Stable"]
-        })
+        with st.container(horizontal=True, vertical_alignment="center"):
+            st.write(":small[Regional Market Analysis]")
+            download_links("regional_markets")
         
         # Display the dataframe
-        st.dataframe(
-            region_data,
-            hide_index=True,
-            use_container_width=True,
-            column_config={
-                "Region": st.column_config.TextColumn("Region", width="medium"),
-                "Market Size ($M)": st.column_config.NumberColumn("Market Size ($M)", format="$%d M"),
-                "Growth Rate (%)": st.column_config.NumberColumn("Growth Rate (%)", format="%.1f%%"),
-                "Our Market Share (%)": st.column_config.NumberColumn("Our Market Share (%)", format="%.1f%%"),
-                "Competitors": st.column_config.NumberColumn("Competitors"),
-                "CAGR (3yr)": st.column_config.TextColumn("CAGR (3yr)"),
-                "Market Trend": st.column_config.TextColumn("Market Trend")
-            }
-        )
\ No newline at end of file
+        loader.slot(
+            dashboard_data.regional_markets,
+            lambda region_data: st.dataframe(
+                region_data,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Region": st.column_config.TextColumn("Region", width="medium"),
+                    "Market Size ($M)": st.column_config.NumberColumn("Market Size ($M)", format="$%d M"),
+                    "Growth Rate (%)": st.column_config.NumberColumn("Growth Rate (%)", format="%.1f%%"),
+                    "Our Market Share (%)": st.column_config.NumberColumn("Our Market Share (%)", format="%.1f%%"),
+                    "Competitors": st.column_config.NumberColumn("Competitors"),
+                    "CAGR (3yr)": st.column_config.NumberColumn("CAGR (3yr)", format="%.1f%%"),
+                    "Market Trend": st.column_config.TextColumn("Market Trend")
+                }
+            ),
+            height=220,
+        )
+
+loader.render_as_completed()
+
+# While the user looks at this view, load the others so switching is instant.
+# Changing the filter cancels this.
+prefetcher.start(
+    [load for other_view, loaders in VIEW_LOADERS.items() if other_view != view for load in loaders]
+)
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cache import prewarm, shared_cache
+from dtypes import compacted
+
+# Source data for the dashboard tables. Kept out of dashboard.py so it can also be
+# loaded outside a script run, e.g. by the export routes in app.py. Results are
+# cached in memory and shared between server processes, and computed at startup.
+# Tables are compacted (see dtypes.py) before they're cached. There are no cache
+# spinners, because most loads happen in the background (see loading.py).
+
+
+@prewarm()
+@st.cache_data(show_spinner=False)
+@shared_cache
+@compacted
+def performance_controls():
+    return pd.DataFrame({
+        "KPI Code": ["KPI-001", "KPI-002", "KPI-003", "KPI-004", "KPI-005", "KPI-006", "KPI-007", "KPI-008", "KPI-009", "KPI-010", "KPI-011", "KPI-012", "KPI-013", "KPI-014", "KPI-015", "KPI-016", "KPI-017", "KPI-018", "KPI-019", "KPI-020"],
+        "Performance Indicator": [
+            "Revenue Growth Rate",
+            "Customer Acquisition Cost",
+            "Customer Lifetime Value",
+            "Churn Rate",
+            "Net Promoter Score",
+            "Gross Margin",
+            "Operating Expense Ratio",
+            "Inventory Turnover",
+            "Days Sales Outstanding",
+            "Return on Investment",
+            "Market Share",
+            "Product Defect Rate",
+            "Employee Satisfaction",
+            "Website Conversion Rate",
+            "Average Order Value",
+            "Sales Cycle Length",
+            "Lead-to-Customer Ratio",
+            "Customer Support Resolution Time",
+            "Social Media Engagement",
+            "Supply Chain Efficiency"
+        ],
+        "Target Value": [
+            "15%", "80$", "450$", "5%", "45", "35%", "25%", "12", "30", "22%", 
+            "18%", "0.5%", "4.2/5", "3.5%", "120$", "14 days", "25%", "4h", "8%", "92%"
+        ],
+        "Status": [
+            "On Track", "At Risk", "On Track", "On Track", "Below Target", 
+            "On Track", "At Risk", "On Track", "Below Target", "On Track",
+            "On Track", "At Risk", "On Track", "On Track", "Below Target",
+            "On Track", "On Track", "At Risk", "On Track", "On Track"
+        ],
+        "Department": [
+            "Sales", "Marketing", "Sales", "Customer Success", "Customer Success",
+            "Finance", "Finance", "Operations", "Finance", "Executive",
+            "Marketing", "Production", "HR", "Marketing", "Sales",
+            "Sales", "Marketing", "Support", "Marketing", "Operations"
+        ],
+        "Review Frequency": [
+            "Monthly", "Quarterly", "Quarterly", "Monthly", "Quarterly",
+            "Monthly", "Monthly", "Weekly", "Monthly", "Quarterly",
+            "Quarterly", "Daily", "Quarterly", "Weekly", "Monthly",
+            "Monthly", "Monthly", "Daily", "Weekly", "Monthly"
+        ],
+    })
+
+
+@prewarm()
+@st.cache_data(show_spinner=False)
+@shared_cache
+@compacted
+def regional_markets():
+    return pd.DataFrame({
+        "Region": ["North America", "Europe", "Asia Pacific", "Latin America", "Middle East & Africa"],
+        "Market Size ($M)": [1850, 1200, 850, 250, 150],
+        "Growth Rate (%)": [7.2, 5.8, 12.5, 9.3, 6.7],
+        "Our Market Share (%)": [28.5, 22.0, 18.5, 15.0, 10.5],
+        "Competitors": [6, 8, 10, 5, 3],
+        "CAGR (3yr)": ["8.2%", "6.5%", "13.2%", "10.1%", "7.5%"],
+        "Market Trend": ["Growing", "Stable", "Rapidly Growing", "Growing", "Stable"]
+    })
+
+
+# Chart data of the dashboard views. Each stands in for an independent source
+# (a warehouse query, an API), so dashboard.py loads them concurrently.
+
+
+@compacted
+def performance_scores():
+    return pd.DataFrame({
+        "Category": ["A", "B", "C", "D"],
+        "Score": [72, 85, 65, 70]
+    })
+
+
+@compacted
+def performance_trend():
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun"]
+    return pd.DataFrame({
+        "Overall Score": [58, 60, 62, 65, 68, 72],
+        "Revenue": [55, 58, 64, 67, 72, 78],
+        "Customer Satisfaction": [65, 63, 60, 62, 65, 68]
+    }, index=months)
+
+
+@compacted
+def underperforming_products():
+    rng = np.random.default_rng(1)
+    return pd.DataFrame(
+        {
+            "Smart Home": rng.integers(0, 20, size=10),
+            "Office IoT": rng.integers(0, 20, size=10),
+            "Industrial Sensors": rng.integers(0, 20, size=10),
+        },
+        index=pd.date_range(start="2023-06-01", end="2024-06-01", periods=10),
+    )
+
+
+@compacted
+def performance_history():
+    rng = np.random.default_rng(2)
+    return pd.DataFrame(
+        {
+            "Company Average": rng.integers(0, 20, size=10),
+            "Product Line": rng.integers(0, 20, size=10),
+        },
+        index=pd.date_range(start="2023-06-01", end="2024-06-01", periods=10),
+    )
+
+
+@compacted
+def market_share_trend():
+    quarters = ["Q1 2023", "Q2 2023", "Q3 2023", "Q4 2023", "Q1 2024", "Q2 2024"]
+    return pd.DataFrame({
+        "Our Company": [18.2, 19.5, 20.3, 21.8, 22.6, 23.5],
+        "Competitor A": [21.5, 20.8, 19.2, 18.8, 18.5, 18.2],
+        "Competitor B": [15.3, 14.8, 14.5, 14.0, 13.8, 13.6],
+        "Competitor C": [12.2, 12.5, 13.0, 13.2, 13.0, 12.8],
+        "Others": [32.8, 32.4, 33.0, 32.2, 32.1, 31.9]
+    }, index=quarters)
+
+
+@compacted
+def competitive_analysis():
+    """Scores per metric (rows) and company (columns)."""
+    rng = np.random.default_rng(3)
+    score_ranges = {"Our Company": (70, 90), "Competitor A": (65, 85), "Competitor B": (60, 80)}
+    market_data = [
+        {"Metric": metric, "Company": company, "Score": rng.integers(low, high)}
+        for metric in ["Price", "Quality", "Innovation", "Brand Value"]
+        for company, (low, high) in score_ranges.items()
+    ]
+    return pd.DataFrame(market_data).pivot(index="Metric", columns="Company", values="Score")
+
+
+# KPIs behind the dashboard's metric cards and how they aggregate.
+KPIS = {
+    "Total Revenue": "sum",
+    "Active Products": "count",
+    "Customer Satisfaction": "mean",
+    "YTD Growth": "ratio",
+    "Total Products": "count",
+    "Underperforming Products": "count",
+    "Overperforming Products": "count",
+    "Market Size": "sum",
+    "Market Share": "ratio",
+    "Competitors": "count",
+}
+PREVIOUS_PERIOD, CURRENT_PERIOD = "2024-Q1", "2024-Q2"
+
+
+@prewarm()
+@st.cache_data(show_spinner=False)
+@shared_cache
+def kpi_events():
+    """Sample event stream as (kpi, period, value, weight) tuples."""
+    rng = np.random.default_rng(42)
+    events = []
+
+    def spread(kpi, period, total, n, weight=None):
+        # n events whose values sum to `total` (and weights to `weight`).
+        shares = rng.random(n)
+        shares /= shares.sum()
+        weights = shares * weight if weight is not None else np.ones(n)
+        events.extend(zip([kpi] * n, [period] * n, shares * total, weights))
+
+    def ratings(kpi, period, mean, n):
+        scores = rng.normal(mean, 1.0, n)
+        scores += mean - scores.mean()
+        events.extend((kpi, period, score, 1.0) for score in scores)
+
+    for i, period in enumerate([PREVIOUS_PERIOD, CURRENT_PERIOD]):
+        spread("Total Revenue", period, [5.16e6, 5.8e6][i], 500)
+        spread("Active Products", period, 0, [37, 42][i])
+        ratings("Customer Satisfaction", period, [8.4, 8.7][i], 300)
+        # Revenue this year over revenue in the same period last year.
+        spread("YTD Growth", period, [1.147e6, 1.182e6][i], 200, weight=1e6)
+        spread("Total Products", period, 0, [5303, 5427][i])
+        spread("Underperforming Products", period, 0, [21, 18][i])
+        spread("Overperforming Products", period, 0, [28, 36][i])
+        spread("Market Size", period, [3.974e9, 4.3e9][i], 1000)
+        # Our sales over total market sales.
+        spread("Market Share", period, [0.214e9, 0.235e9][i], 400, weight=1e9)
+        spread("Competitors", period, 0, [16, 14][i])
+    return events
+
+
+def import_chart_libraries():
+    import altair  # noqa: F401
+
+
+# What the dashboard loads on its first run, besides its own modules. Other
+# pages load this in the background (`loading.warm_up`), so it doesn't start cold.
+WARMUP = [import_chart_libraries, performance_controls, regional_markets, kpi_events]
@@ -365,4 +365,19 @@ data = {
     ],
 }
 
-df = pd.DataFrame(data)
\ No newline at end of file
+df = pd.DataFrame(data)
+
+# Vocabulary of the "Tags" column.
+tag_options = [
+    "Technology",
+    "Devices",
+    "Cloud",
+    "Retail",
+    "Ads",
+    "Auto",
+    "Social",
+    "AI",
+    "Semiconductors",
+    "Finance",
+    "Conglomerate",
+]
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""Compact dtypes for the app's DataFrames.
+
+Pandas defaults to 64-bit numbers and one Python string per cell. `compact`
+downcasts integers (and floats that fit float32 exactly), stores repetitive
+strings as categoricals and parses columns of percent strings ("8.2%") into
+numbers, so frames take less memory in the caches and fewer bytes on the wire.
+List columns are left alone: the list column types and the editor need lists.
+"""
+
+import functools
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Strings become categoricals if at most this share of the values is distinct.
+MAX_CATEGORY_RATIO = 0.5
+
+_PERCENT = r"-?\d+(?:\.\d+)?%"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _is_strings(column):
+    return pd.api.types.is_string_dtype(column) and not isinstance(column.dtype, pd.CategoricalDtype)
+
+
+def compact_column(column, max_category_ratio=MAX_CATEGORY_RATIO):
+    """The smallest lossless representation of one column."""
+    if pd.api.types.is_bool_dtype(column):
+        return column
+    if pd.api.types.is_integer_dtype(column):
+        return pd.to_numeric(column, downcast="integer")
+    if pd.api.types.is_float_dtype(column):
+        # Rounding to float32 would change how values like 175.43 display.
+        narrow = column.astype(np.float32)
+        exact = (narrow.astype(column.dtype) == column) | column.isna()
+        return narrow if exact.all() else column
+    if _is_strings(column):
+        values = column.dropna()
+        if len(values) and values.str.fullmatch(_PERCENT).all():
+            # In percent units, like the other "(%)" columns of the app.
+            return column.str.rstrip("%").astype(float)
+        if values.nunique() <= max_category_ratio * len(column):
+            return column.astype("category")
+    return column
+
+
+def compact(frame, max_category_ratio=MAX_CATEGORY_RATIO):
+    """A copy of `frame` with each column in its most compact dtype."""
+    return frame.apply(compact_column, max_category_ratio=max_category_ratio)
+
+
+def savings(before, after):
+    """Memory per column of a frame before and after `compact`."""
+    report = pd.DataFrame({
+        "dtype before": before.dtypes.astype(str),
+        "dtype after": after.dtypes.astype(str),
+        "bytes before": before.memory_usage(deep=True, index=False),
+        "bytes after": after.memory_usage(deep=True, index=False),
+    })
+    report["bytes saved"] = report["bytes before"] - report["bytes after"]
+    return report
+
+
+def compacted(func):
+    """Decorator that compacts the DataFrame returned by `func`.
+
+    Put it below caching decorators, so that the compact frame is cached.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        frame = func(*args, **kwargs)
+        result = compact(frame)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            saved = savings(frame, result)
+            _LOGGER.debug(
+                "Compacted %s from %d to %d bytes",
+                func.__qualname__,
+                saved["bytes before"].sum(),
+                saved["bytes after"].sum(),
+            )
+        return result
+
+    return wrapper
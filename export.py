@@ -0,0 +1,121 @@
+"""Streaming CSV/Parquet export of tables.
+
+Tables are read from their source in chunks and each chunk is serialized and
+sent before the next one is read, so memory stays constant no matter how many
+rows are exported. `export_routes` exposes this as HTTP routes for `st.App`.
+"""
+
+from urllib.parse import urlencode
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+CHUNK_ROWS = 100_000
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def iter_chunks(frame, chunk_rows=CHUNK_ROWS):
+    """Split an in-memory frame into chunks. Sources backed by a database or
+    files should yield chunks directly instead (e.g. `pd.read_sql(chunksize=...)`)."""
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start : start + chunk_rows]
+
+
+def iter_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+
+
+class _ChunkSink:
+    """Write-only file object that hands out what was written since last time."""
+
+    closed = False
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data):
+        self._buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_parquet(chunks):
+    # Every chunk becomes its own row group.
+    sink = _ChunkSink()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        else:
+            # A chunk can infer a different type, e.g. null for an all-empty column.
+            table = table.cast(writer.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+SERIALIZERS = {"csv": iter_csv, "parquet": iter_parquet}
+
+
+def export_url(name, file_format, **params):
+    query = urlencode({key: value for key, value in params.items() if value}, doseq=True)
+    return f"/export/{name}.{file_format}" + (f"?{query}" if query else "")
+
+
+def download_links(name, **params):
+    """Link buttons to export a table. Only work when served through app.py."""
+    with st.container(horizontal=True, horizontal_alignment="right", gap=None):
+        for file_format in SERIALIZERS:
+            st.link_button(
+                file_format.upper(),
+                export_url(name, file_format, **params),
+                icon=":material/download:",
+                type="tertiary",
+            )
+
+
+def export_routes(sources):
+    """Routes serving `/export/<name>.<csv|parquet>` for each source.
+
+    `sources` maps a table name to a function that takes the request's query
+    params and returns an iterator of DataFrame chunks. It should raise
+    `ValueError` for invalid params, which is answered with a 400.
+    """
+
+    def endpoint(request):
+        name = request.path_params["name"]
+        file_format = request.path_params["format"]
+        if name not in sources or file_format not in SERIALIZERS:
+            return PlainTextResponse("Not found", status_code=404)
+
+        try:
+            chunks = sources[name](request.query_params)
+        except ValueError as error:
+            return PlainTextResponse(str(error), status_code=400)
+        return StreamingResponse(
+            SERIALIZERS[file_format](chunks),
+            media_type=MEDIA_TYPES[file_format],
+            headers={"Content-Disposition": f'attachment; filename="{name}.{file_format}"'},
+        )
+
+    return [Route("/export/{name}.{format}", endpoint)]
@@ -1,10 +1,14 @@
 import numpy as np
 import pandas as pd
-import plotly.express as px
-import pydeck as pdk
 import streamlit as st
 
-from data import df
+from companies import REFRESH_SECONDS, company_table
+from data import df, tag_options
+from export import download_links
+from matrix import matrix_multiplication
+from portfolio import portfolio_history
+from selection import ChartSelection, DataframeSelection
+from tags import tag_filter
 
 st.set_page_config(layout="centered")
 
@@ -91,40 +95,48 @@ st.line_chart(
 ##### Simple examples
 """
 
+# Only the open tab's body runs. Switching tabs reruns the script, so work in a
+# tab only happens once it's opened (and should be cached to stay cheap after).
 tab1, tab2, tab3, tab4 = st.tabs(
     [
         "Horizontal container with buttons",
         "Centered text",
         "Gap + right aligned",
         "Distributed elements",
-    ]
+    ],
+    key="flex_examples",
+    on_change="rerun",
 )
 
-with tab1:
-    with st.echo():
-        with st.container(horizontal=True):
-            st.button("Button 1")
-            st.button("Button 2")
-            st.button("Button 3")
+if tab1.open:
+    with tab1:
+        with st.echo():
+            with st.container(horizontal=True):
+                st.button("Button 1")
+                st.button("Button 2")
+                st.button("Button 3")
 
-with tab2:
-    with st.echo():
-        with st.container(horizontal=True, horizontal_alignment="center"):
-            st.markdown("This text is centered!", width="content")
+if tab2.open:
+    with tab2:
+        with st.echo():
+            with st.container(horizontal=True, horizontal_alignment="center"):
+                st.markdown("This text is centered!", width="content")
 
-with tab3:
-    with st.echo():
-        with st.container(gap="large", horizontal_alignment="right"):
-            st.button("Top button")
-            st.button("Middle button")
-            st.button("Bottom button")
+if tab3.open:
+    with tab3:
+        with st.echo():
+            with st.container(gap="large", horizontal_alignment="right"):
+                st.button("Top button")
+                st.button("Middle button")
+                st.button("Bottom button")
 
-with tab4:
-    with st.echo():
-        with st.container(horizontal=True, horizontal_alignment="distribute"):
-            st.button("Left")
-            st.button("Middle")
-            st.button("Right")
+if tab4.open:
+    with tab4:
+        with st.echo():
+            with st.container(horizontal=True, horizontal_alignment="distribute"):
+                st.button("Left")
+                st.button("Middle")
+                st.button("Right")
 
 """
 ##### Complex example
@@ -143,7 +155,17 @@ if st.button("📊 View dashboard example"):
 ""
 
 
-editable = st.toggle("Make editable", False)
+with st.container(horizontal=True, vertical_alignment="bottom"):
+    selected_tags = st.multiselect("Filter by tags", tag_options, width="stretch")
+    tag_match = st.segmented_control("Match", ["any", "all"], default="any")
+
+with st.container(horizontal=True, vertical_alignment="center"):
+    editable = st.toggle("Make editable", False)
+    # Live updates would overwrite edits.
+    live = st.toggle("Live updates", False, disabled=editable)
+    # Exports stream from the server, so they also work for tables that are too
+    # big to ship to the browser.
+    download_links("companies", tag=selected_tags, match=tag_match if selected_tags else None)
 
 column_config = {
     "Company Name": st.column_config.TextColumn(pinned=True),
@@ -163,19 +185,7 @@ column_config = {
     "Last Updated": st.column_config.DatetimeColumn(format="MMM DD, YYYY h:mm a"),
     "Website": st.column_config.LinkColumn(),
     "Tags": st.column_config.MultiselectColumn(
-        options=[
-            "Technology",
-            "Devices",
-            "Cloud",
-            "Retail",
-            "Ads",
-            "Auto",
-            "Social",
-            "AI",
-            "Semiconductors",
-            "Finance",
-            "Conglomerate",
-        ],
+        options=tag_options,
         color=[
             "blue",
             "blue",
@@ -192,10 +202,32 @@ column_config = {
     ),
 }
 
-if editable:
-    st.data_editor(df, column_config=column_config)
-else:
-    st.dataframe(df, column_config=column_config)
+
+live = live and not editable
+
+
+# With live updates, only this table reruns, and each refresh only fetches the
+# rows that changed since the last one.
+@st.fragment(run_every=REFRESH_SECONDS if live else None)
+def companies_table(selected_tags, tag_match, editable, live):
+    table = company_table()
+    if live:
+        table.refresh()
+    companies_df, derived = table.snapshot()
+
+    filtered_df = companies_df
+    if selected_tags:
+        filtered_df = companies_df[
+            tag_filter(derived["tags"], selected_tags, tag_options, tag_match or "any")
+        ]
+
+    if editable:
+        st.data_editor(filtered_df, column_config=column_config)
+    else:
+        st.dataframe(filtered_df, column_config=column_config)
+
+
+companies_table(selected_tags, tag_match, editable, live)
 
 
 """
@@ -237,24 +269,57 @@ selection_type = st.segmented_control(
     label_visibility="collapsed",
 )
 
+# Plotly and pydeck are slow to import, so only load them for the selected example.
 if selection_type == "Chart":
-    df = px.data.gapminder()
-    fig = px.scatter(
-        df.query("year==2007"),
-        x="gdpPercap",
-        y="lifeExp",
-        size="pop",
-        color="continent",
-        hover_name="country",
-        log_x=True,
-        size_max=60,
-    )
+    import plotly.express as px
+
+    from animation import animated_scatter
+    from dtypes import compacted
+
+    @st.cache_data
+    @compacted
+    def gapminder():
+        return px.data.gapminder()
+
+    @st.cache_resource
+    def gapminder_animation():
+        # Built once per server. Playing and scrubbing through the years then
+        # runs in the browser, without reruns.
+        return animated_scatter(
+            gapminder(),
+            frame="year",
+            group="country",
+            x="gdpPercap",
+            y="lifeExp",
+            size="pop",
+            color="continent",
+            hover_name="country",
+            log_x=True,
+            size_max=60,
+        )
+
+    if st.toggle("Animate over the years", False):
+        fig = gapminder_animation()
+    else:
+        df = gapminder()
+        fig = px.scatter(
+            df.query("year==2007"),
+            x="gdpPercap",
+            y="lifeExp",
+            size="pop",
+            color="continent",
+            hover_name="country",
+            log_x=True,
+            size_max=60,
+        )
 
     with st.echo():
         event_data = st.plotly_chart(fig, on_select="rerun")
 
-    "Return value:"
-    st.write(event_data)
+    # Box-selecting many points returns a dict per point, so show the selection
+    # as index ranges per trace instead.
+    "Return value, as index ranges or bitmaps per trace:"
+    st.write(ChartSelection(event_data.selection, fig).to_json())
 
 elif selection_type == "Dataframe":
     df_small = df[["Company Name", "Stock Price", "Tags"]]
@@ -264,10 +329,12 @@ elif selection_type == "Dataframe":
             on_select="rerun",
             selection_mode=["multi-row", "multi-column", "multi-cell"],
         )
-    "Return value:"
-    st.write(event_data)
+    "Return value, as index ranges or bitmaps:"
+    st.write(DataframeSelection(event_data.selection, df_small).to_json())
 
 elif selection_type == "Map":
+    import pydeck as pdk
+
     H3_HEX_DATA = [
         {"hex": "88283082b9fffff", "count": 10},
         {"hex": "88283082d7fffff", "count": 50},
@@ -331,18 +398,11 @@ Fragments allow you to rerun only a part of your app when interacting with a wid
 
 if st.toggle("Show fragment example (slow)", False):
 
-    @st.cache_data
-    def matrix_multiplication(size: int):
-        with st.spinner("Multiplying matrices..."):
-            a = np.random.rand(size, size)
-            b = np.random.rand(size, size)
-            result = np.dot(a, b)
-        return result
-
     size = st.slider(
         "Matrix size", min_value=100, max_value=1000, value=100, step=100
     )
-    result = matrix_multiplication(size)
+    with st.spinner("Multiplying matrices..."):
+        result = matrix_multiplication(size)
     st.dataframe(result[:100, :100])
 
     greetings = [
@@ -403,3 +463,9 @@ with st.echo():
             st.logout()
         st.write(f"Hello, {st.user.name}! 👋 Your email is {st.user.email}.")
 
+if st.user.is_logged_in:
+    # Computed once per user, then kept across page switches, reconnects and
+    # tabs. Other users never see it.
+    st.write("Your portfolio over the last year:")
+    st.line_chart(portfolio_history(st.user.email), height=200)
+
@@ -0,0 +1,72 @@
+"""Incrementally maintained KPIs.
+
+Each KPI keeps running totals per period, so recording an event is O(1) and
+reading a value or a period-over-period delta doesn't scan any fact table.
+"""
+
+import threading
+from collections import defaultdict
+
+AGGREGATES = ("sum", "count", "mean", "ratio")
+
+
+class Kpi:
+    """Running aggregate of one metric, per period.
+
+    Events carry a `value` and a `weight`. Depending on `aggregate`, the KPI is
+    the sum of values, the number of events, the mean value, or the ratio of
+    summed values to summed weights (e.g. revenue / last year's revenue).
+    """
+
+    def __init__(self, aggregate="sum"):
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"aggregate must be one of {AGGREGATES}, got {aggregate!r}")
+        self.aggregate = aggregate
+        self._values = defaultdict(float)
+        self._weights = defaultdict(float)
+        self._counts = defaultdict(int)
+
+    def add(self, period, value=1.0, weight=1.0):
+        self._values[period] += value
+        self._weights[period] += weight
+        self._counts[period] += 1
+
+    def value(self, period):
+        if not self._counts[period]:
+            return None
+        if self.aggregate == "sum":
+            return self._values[period]
+        if self.aggregate == "count":
+            return self._counts[period]
+        if self.aggregate == "mean":
+            return self._values[period] / self._counts[period]
+        return self._values[period] / self._weights[period]
+
+
+class KpiEngine:
+    """A set of named KPIs compared between a current and a previous period."""
+
+    def __init__(self, kpis, current, previous):
+        self.kpis = {name: Kpi(aggregate) for name, aggregate in kpis.items()}
+        self.current = current
+        self.previous = previous
+        self._lock = threading.Lock()
+
+    def add(self, name, period, value=1.0, weight=1.0):
+        # Events can come from any session thread.
+        with self._lock:
+            self.kpis[name].add(period, value, weight)
+
+    def value(self, name, period=None):
+        return self.kpis[name].value(period or self.current)
+
+    def delta(self, name, relative=False):
+        """Change from the previous to the current period. With `relative`, as a
+        fraction of the previous value."""
+        current = self.value(name, self.current)
+        previous = self.value(name, self.previous)
+        if current is None or previous is None:
+            return None
+        if relative:
+            return current / previous - 1 if previous else None
+        return current - previous
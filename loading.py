@@ -0,0 +1,176 @@
+"""Concurrent data loading with progressive rendering.
+
+`ConcurrentLoader.slot` reserves a skeleton where a section goes and starts
+loading its data in a thread pool. `render_as_completed` then draws each
+section as soon as its data is ready, so a view takes as long as its slowest
+source rather than the sum of all of them.
+
+`Prefetcher` loads the data of sections that aren't shown yet (e.g. other
+views) in the background, so that switching to them doesn't wait for it.
+`warm_up` does the same for other pages, once per server process.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+
+class ConcurrentLoader:
+    """Loads the data of a page's sections concurrently, for one script run.
+
+    Create it at the top of the script, call `slot` where each section goes and
+    `render_as_completed` at the end.
+    """
+
+    def __init__(self, max_workers=8, prefetcher=None):
+        # Loaders may call `st.cache_data` functions, which need the script's context.
+        self._executor = ThreadPoolExecutor(
+            max_workers,
+            thread_name_prefix="loader",
+            initializer=add_script_run_ctx,
+            initargs=(None, get_script_run_ctx()),
+        )
+        self._pending = {}
+        self._prefetcher = prefetcher
+
+    def slot(self, load, render, height=None):
+        """Show a skeleton here and start `load()` in the background.
+
+        `render(data)` is called in its place once `load` returns. `height`
+        should match the rendered section, so the layout doesn't jump. If
+        `load` was prefetched, its result is used instead.
+        """
+        if self._prefetcher is not None:
+            load = self._prefetcher.cached(load)
+        placeholder = st.skeleton(height=height)
+        self._pending[self._executor.submit(load)] = (placeholder, render)
+
+    def render_as_completed(self):
+        """Wait for all loads and render each section as soon as it's loaded."""
+        try:
+            for future in as_completed(self._pending):
+                placeholder, render = self._pending.pop(future)
+                with placeholder.container():
+                    try:
+                        data = future.result()
+                    except Exception as exception:
+                        # One failing source shouldn't take down the other sections.
+                        st.exception(exception)
+                    else:
+                        render(data)
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            # The executor keeps its finished threads. Streamlit's hashing keeps
+            # a value per thread that can refer back to this page, so holding
+            # on to them would keep every script run's page in memory.
+            self._executor = None
+
+
+def _name(load):
+    return f"{load.__module__}.{load.__qualname__}"
+
+
+class Prefetcher:
+    """Loads data in the background and keeps the results until they're used.
+
+    Results are only valid for the filters (`key`) they were loaded with. Get
+    it with `session_prefetcher`, which cancels loads for outdated filters.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._futures = {}
+        self._cancelled = threading.Event()
+
+    def start(self, loaders, max_workers=2):
+        """Start loading each of `loaders` that isn't loaded or loading yet."""
+        loaders = [load for load in loaders if _name(load) not in self._futures]
+        if not loaders or self._cancelled.is_set():
+            return
+        # Without the script's context: the workers outlive this script run, and
+        # cached functions would show their spinners in a run that's finished.
+        executor = ThreadPoolExecutor(max_workers, thread_name_prefix="prefetch")
+        for load in loaders:
+            self._futures[_name(load)] = executor.submit(self._load, load)
+        # Workers exit once the queue is done, without blocking this script run.
+        executor.shutdown(wait=False)
+
+    def _load(self, load):
+        if self._cancelled.is_set():
+            return None
+        return load()
+
+    def cancel(self):
+        self._cancelled.set()
+        for future in self._futures.values():
+            future.cancel()
+
+    def cached(self, load):
+        """Wrap `load` to return its prefetched result, waiting for it if it's
+        still loading, and to call `load` only if it wasn't prefetched.
+
+        A prefetched result is used once. Later loads call `load` again, or a
+        new prefetch, so they get the loader's refreshes (e.g. cache TTLs).
+        """
+        future = self._futures.pop(_name(load), None)
+        if future is None or self._cancelled.is_set():
+            return load
+
+        def cached_load():
+            if not future.cancelled() and future.exception() is None:
+                return future.result()
+            return load()
+
+        return cached_load
+
+
+_LOGGER = logging.getLogger(__name__)
+
+_warmed = set()
+_warmed_lock = threading.Lock()
+
+
+def _warm(load):
+    try:
+        load()
+    except Exception:
+        _LOGGER.exception("Warming up %s failed", _name(load))
+
+
+def warm_up(loaders, max_workers=2):
+    """Call each of `loaders` once per server process, in the background.
+
+    Meant for work whose results all sessions share, like imports and cached
+    functions, of pages the user is likely to open next. Call it at the end of
+    a script run, so it happens while the user looks at the page. Like
+    `Prefetcher`, it runs outside the script's context.
+    """
+    with _warmed_lock:
+        loaders = [load for load in loaders if _name(load) not in _warmed]
+        _warmed.update(_name(load) for load in loaders)
+    if not loaders:
+        return
+    executor = ThreadPoolExecutor(max_workers, thread_name_prefix="warmup")
+    for load in loaders:
+        executor.submit(_warm, load)
+    executor.shutdown(wait=False)
+
+
+_PREFETCHER_KEY = "_prefetcher"
+
+
+def session_prefetcher(key=()):
+    """This session's `Prefetcher` for the filters `key`.
+
+    When `key` changed since the last script run, loads for the old filters
+    are cancelled and their results dropped.
+    """
+    prefetcher = st.session_state.get(_PREFETCHER_KEY)
+    if prefetcher is None or prefetcher.key != key:
+        if prefetcher is not None:
+            prefetcher.cancel()
+        prefetcher = st.session_state[_PREFETCHER_KEY] = Prefetcher(key)
+    return prefetcher
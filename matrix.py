@@ -0,0 +1,15 @@
+import numpy as np
+import streamlit as st
+
+from cache import prewarm, shared_cache
+
+
+# Cached in memory, and shared with the app's other server processes. The
+# default slider value and a few common sizes are computed at startup.
+@prewarm((100,), (500,), (1000,))
+@st.cache_data
+@shared_cache
+def matrix_multiplication(size: int):
+    a = np.random.rand(size, size)
+    b = np.random.rand(size, size)
+    return np.dot(a, b)
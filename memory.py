@@ -0,0 +1,127 @@
+"""Memory accounting per session and per cache, with leak alerts.
+
+`record_session_memory` samples the current session's state size on each rerun
+(throttled) and warns when it exceeds `SESSION_MEMORY_LIMIT_BYTES`. Set the
+`MEMORY_REPORT=1` environment variable on the server to show the full report on
+every page. It's off by default, since it shows the whole server's caches.
+"""
+
+import logging
+import os
+import time
+from collections import deque
+
+import pandas as pd
+import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.runtime.stats import CACHE_MEMORY_FAMILY, safe_sizeof
+
+import cache
+
+REPORT_ENABLED = os.environ.get("MEMORY_REPORT") == "1"
+SESSION_MEMORY_LIMIT_BYTES = 100 * 1024 * 1024
+SAMPLE_INTERVAL_SECONDS = 10
+HISTORY_LENGTH = 360
+
+_HISTORY_KEY = "_memory_history"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def sizeof(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)) or hasattr(value, "nbytes"):
+        return cache.nbytes(value)
+    return safe_sizeof(value)
+
+
+def session_state_sizes():
+    """Bytes held by each key in this session's state, including keyed widgets."""
+    return {
+        key: sizeof(value)
+        for key, value in st.session_state.items()
+        if key != _HISTORY_KEY
+    }
+
+
+def session_memory():
+    """Total bytes held by this session's state, including unkeyed widgets."""
+    ctx = get_script_run_ctx()
+    return safe_sizeof(ctx.session_state) if ctx else 0
+
+
+def cache_sizes():
+    """Bytes held by each cached function in this server process."""
+    sizes = {}
+    if runtime.exists():
+        stats = runtime.get_instance().stats_mgr.get_stats([CACHE_MEMORY_FAMILY])
+        for stat in stats.get(CACHE_MEMORY_FAMILY, []):
+            if stat.category_name in ("st_cache_data", "st_cache_resource"):
+                name = (stat.category_name, stat.cache_name)
+                sizes[name] = sizes.get(name, 0) + stat.byte_length
+
+    # Only the total, so the report doesn't show who is logged in.
+    user_sizes = cache.user_cache_sizes()
+    if user_sizes:
+        sizes[("user_cache", f"({len(user_sizes)} users)")] = sum(user_sizes.values())
+    return sizes
+
+
+def record_session_memory():
+    """Sample this session's memory and alert if it's over the limit."""
+    history = st.session_state.setdefault(_HISTORY_KEY, deque(maxlen=HISTORY_LENGTH))
+    now = time.time()
+    if history and now - history[-1][0] < SAMPLE_INTERVAL_SECONDS:
+        return
+
+    size = session_memory()
+    history.append((now, size))
+    if size > SESSION_MEMORY_LIMIT_BYTES:
+        _LOGGER.warning("Session holds %.1f MiB of state", size / 2**20)
+        st.toast(
+            f"This session holds {size / 2**20:.0f} MiB of state, more than the "
+            f"{SESSION_MEMORY_LIMIT_BYTES / 2**20:.0f} MiB limit.",
+            icon=":material/memory:",
+        )
+
+
+def growth_per_minute():
+    """Session state growth in bytes per minute over the recorded history."""
+    history = st.session_state.get(_HISTORY_KEY)
+    if not history or len(history) < 2:
+        return 0.0
+    (start, first), (end, last) = history[0], history[-1]
+    return (last - first) / max(end - start, 1) * 60
+
+
+def memory_report():
+    with st.expander("Memory", icon=":material/memory:", expanded=True):
+        history = st.session_state.get(_HISTORY_KEY, [])
+        st.metric(
+            "Session state",
+            f"{history[-1][1] / 2**20:.2f} MiB" if history else "n/a",
+            delta=f"{growth_per_minute() / 2**10:+.1f} KiB/min",
+            delta_color="inverse",
+        )
+        if history:
+            st.line_chart(
+                pd.DataFrame(history, columns=["Time", "Bytes"]).assign(
+                    Time=lambda df: pd.to_datetime(df["Time"], unit="s")
+                ),
+                x="Time",
+                y="Bytes",
+                height=150,
+            )
+        sizes = session_state_sizes()
+        sizes["(widgets and other state)"] = max(session_memory() - sum(sizes.values()), 0)
+        st.dataframe(
+            pd.DataFrame(sizes.items(), columns=["Key", "Bytes"]),
+            hide_index=True,
+        )
+        st.dataframe(
+            pd.DataFrame(
+                [(*name, size) for name, size in cache_sizes().items()],
+                columns=["Cache", "Function", "Bytes"],
+            ),
+            hide_index=True,
+        )
@@ -0,0 +1,32 @@
+"""The logged-in user's portfolio on the home page.
+
+Stands in for an expensive per-user query, like the user's positions joined
+with each company's price history. It's cached with `cache.user_cache`, so it's
+computed once per user and kept across page switches, reconnects and tabs,
+without ever being shown to another user.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from cache import user_cache
+from data import df
+
+
+@user_cache
+def portfolio_history(email, days=365):
+    """Daily value of the user's positions over the last `days` days."""
+    # Positions and prices would come from a database. Here they're simulated,
+    # seeded by the email so that every user gets their own.
+    seed = int.from_bytes(hashlib.sha256(email.encode()).digest()[:8], "big")
+    rng = np.random.default_rng(seed)
+    shares = rng.integers(0, 50, len(df))
+    growth = np.cumprod(1 + rng.normal(0.0003, 0.02, (days, len(df))), axis=0)
+    # Price paths that end at today's prices.
+    prices = df["Stock Price"].to_numpy() * growth / growth[-1]
+    return pd.DataFrame(
+        {"Portfolio value": prices @ shares},
+        index=pd.date_range(end=pd.Timestamp.today().normalize(), periods=days, name="Date"),
+    )
@@ -0,0 +1,46 @@
+"""Server-side typeahead search over large catalogues of names."""
+
+from bisect import bisect_left
+
+
+class SearchIndex:
+    """Case-insensitive prefix index over every word start of every entry.
+
+    "ret" finds both "Retention Rate" and "Customer Retention". A lookup is a
+    binary search plus a scan over at most the matching keys, so it stays fast
+    for millions of entries, and only the top matches are sent to the browser.
+    """
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        keys = []
+        for entry_id, entry in enumerate(self.entries):
+            words = entry.lower().split()
+            for start in range(len(words)):
+                keys.append((" ".join(words[start:]), entry_id))
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._entry_ids = [entry_id for _, entry_id in keys]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, query, limit=10):
+        query = " ".join(query.lower().split())
+        if not query:
+            return self.entries[:limit]
+
+        results = []
+        seen = set()
+        position = bisect_left(self._keys, query)
+        while (
+            len(results) < limit
+            and position < len(self._keys)
+            and self._keys[position].startswith(query)
+        ):
+            entry_id = self._entry_ids[position]
+            if entry_id not in seen:
+                seen.add(entry_id)
+                results.append(self.entries[entry_id])
+            position += 1
+        return results
@@ -0,0 +1,191 @@
+"""Compact, lazily materialized selections from charts and dataframes.
+
+Selection events list every selected row, cell or point, so box-selecting a
+large chart or a long row range produces lists with millions of entries that
+are slow to keep around and to display. `IndexSet` stores them as ranges, or
+as a bitmap when they are fragmented, and `DataframeSelection` and
+`ChartSelection` only look up the selected data when it's accessed.
+"""
+
+import base64
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+# Bytes per range: a start and a stop as int64.
+_RANGE_BYTES = 16
+
+
+class IndexSet:
+    """Sorted set of row or point positions, encoded as ranges or a bitmap.
+
+    Contiguous selections (a box, a shift-click range) cost 16 bytes per range.
+    Fragmented ones use one bit per position between the smallest and the
+    largest index instead, whichever is smaller.
+    """
+
+    def __init__(self, indices=()):
+        # Sorting and dropping repeats is much faster than `np.unique` here.
+        indices = np.sort(np.asarray(indices, dtype=np.int64))
+        indices = indices[np.r_[True, indices[1:] != indices[:-1]]] if len(indices) else indices
+        self._len = len(indices)
+        self._ranges = np.empty((0, 2), dtype=np.int64)
+        self._bitmap = None
+        self.offset = int(indices[0]) if len(indices) else 0
+        self.span = int(indices[-1]) + 1 - self.offset if len(indices) else 0
+        if not len(indices):
+            return
+
+        breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+        if (len(breaks) + 1) * _RANGE_BYTES <= (self.span + 7) // 8:
+            starts = indices[np.r_[0, breaks]]
+            stops = indices[np.r_[breaks - 1, len(indices) - 1]] + 1
+            self._ranges = np.column_stack([starts, stops])
+        else:
+            mask = np.zeros(self.span, dtype=bool)
+            mask[indices - self.offset] = True
+            self._bitmap = np.packbits(mask)
+
+    @classmethod
+    def from_json(cls, data):
+        index_set = cls()
+        if "ranges" in data:
+            index_set._ranges = np.array(data["ranges"], dtype=np.int64).reshape(-1, 2)
+            index_set._len = int((index_set._ranges[:, 1] - index_set._ranges[:, 0]).sum())
+            if index_set._len:
+                index_set.offset = int(index_set._ranges[0, 0])
+                index_set.span = int(index_set._ranges[-1, 1]) - index_set.offset
+        else:
+            index_set.offset = data["offset"]
+            index_set.span = data["span"]
+            index_set._bitmap = np.frombuffer(base64.b64decode(data["bitmap"]), dtype=np.uint8)
+            index_set._len = int(np.unpackbits(index_set._bitmap).sum())
+        return index_set
+
+    def to_json(self):
+        if self._bitmap is None:
+            return {"ranges": self._ranges.tolist()}
+        return {
+            "offset": self.offset,
+            "span": self.span,
+            "bitmap": base64.b64encode(self._bitmap.tobytes()).decode(),
+        }
+
+    @property
+    def nbytes(self):
+        """Size of the encoded set."""
+        return self._ranges.nbytes if self._bitmap is None else self._bitmap.nbytes
+
+    def to_array(self):
+        if self._bitmap is not None:
+            return np.flatnonzero(np.unpackbits(self._bitmap, count=self.span)) + self.offset
+        return np.concatenate(
+            [np.arange(start, stop) for start, stop in self._ranges] or [np.empty(0, np.int64)]
+        )
+
+    def take(self, data):
+        """Select these positions from a DataFrame, Series or array.
+
+        A single range is sliced, which doesn't copy the data.
+        """
+        if self._bitmap is None and len(self._ranges) == 1:
+            start, stop = self._ranges[0]
+            return data.iloc[start:stop] if hasattr(data, "iloc") else data[start:stop]
+        positions = self.to_array()
+        return data.iloc[positions] if hasattr(data, "iloc") else data[positions]
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return iter(self.to_array().tolist())
+
+    def __contains__(self, index):
+        if not self._len or not self.offset <= index < self.offset + self.span:
+            return False
+        if self._bitmap is not None:
+            position = index - self.offset
+            return bool(self._bitmap[position // 8] & (0x80 >> position % 8))
+        row = np.searchsorted(self._ranges[:, 0], index, side="right") - 1
+        return bool(index < self._ranges[row, 1])
+
+    def __eq__(self, other):
+        if not isinstance(other, IndexSet):
+            return NotImplemented
+        return len(self) == len(other) and np.array_equal(self.to_array(), other.to_array())
+
+    def __repr__(self):
+        encoding = "bitmap" if self._bitmap is not None else f"{len(self._ranges)} ranges"
+        return f"IndexSet({self._len} indices as {encoding}, {self.nbytes} bytes)"
+
+
+class DataframeSelection:
+    """Selection of an `st.dataframe(on_select=...)` event over `data`."""
+
+    def __init__(self, selection, data):
+        self.data = data
+        self.rows = IndexSet(selection.get("rows", []))
+        self.columns = list(selection.get("columns", []))
+        cells = pd.DataFrame(selection.get("cells", []), columns=["row", "column"])
+        self.cells = {
+            column: IndexSet(group["row"]) for column, group in cells.groupby("column", sort=False)
+        }
+
+    @cached_property
+    def selected_rows(self):
+        return self.rows.take(self.data)
+
+    @cached_property
+    def selected_columns(self):
+        return self.data[self.columns]
+
+    def to_json(self):
+        return {
+            "rows": self.rows.to_json(),
+            "columns": self.columns,
+            "cells": {column: rows.to_json() for column, rows in self.cells.items()},
+        }
+
+
+class ChartSelection:
+    """Selection of an `st.plotly_chart(on_select=...)` event over `figure`.
+
+    Points are grouped by trace (`curve_number`), because `point_index` counts
+    within a trace.
+    """
+
+    def __init__(self, selection, figure):
+        self.figure = figure
+        points = selection.get("points", [])
+        curves = np.fromiter((point["curve_number"] for point in points), np.int64, len(points))
+        indices = np.fromiter((point["point_index"] for point in points), np.int64, len(points))
+        self.points = {
+            int(curve): IndexSet(indices[curves == curve]) for curve in np.unique(curves)
+        }
+
+    def __len__(self):
+        return sum(len(indices) for indices in self.points.values())
+
+    @cached_property
+    def selected_points(self):
+        """The selected points' trace name, x and y."""
+        frames = []
+        for curve, indices in self.points.items():
+            trace = self.figure.data[curve]
+            frames.append(
+                pd.DataFrame({
+                    "trace": trace.name,
+                    "x": indices.take(np.asarray(trace.x)),
+                    "y": indices.take(np.asarray(trace.y)),
+                })
+            )
+        if not frames:
+            return pd.DataFrame(columns=["trace", "x", "y"])
+        return pd.concat(frames, ignore_index=True)
+
+    def to_json(self):
+        return {
+            self.figure.data[curve].name or str(curve): indices.to_json()
+            for curve, indices in self.points.items()
+        }
@@ -1,16 +1,26 @@
 import streamlit as st
 
+from loading import warm_up
+from memory import REPORT_ENABLED, memory_report, record_session_memory
+
 st.set_page_config(page_title="PyData Paris 2025", page_icon="🇫🇷")
 st.logo(
     "https://streamlit.io/images/brand/streamlit-mark-color.svg",
     link="https://streamlit.io",
 )
 
-page = st.navigation(
-    [
-        st.Page("home.py", title="Home", icon="🏠"),
-        st.Page("dashboard.py", title="Dashboard", icon="📊"),
-    ],
-    position="top",
-)
+home = st.Page("home.py", title="Home", icon="🏠")
+dashboard = st.Page("dashboard.py", title="Dashboard", icon="📊")
+page = st.navigation([home, dashboard], position="top")
+record_session_memory()
 page.run()
+
+# Once this page is rendered, prepare the dashboard in the background, so
+# switching to it (e.g. with "View dashboard example") doesn't start cold.
+if page.url_path != dashboard.url_path:
+    import dashboard_data
+
+    warm_up(dashboard_data.WARMUP)
+
+if REPORT_ENABLED:
+    memory_report()
@@ -0,0 +1,34 @@
+"""Conditional formatting for dataframes without a pandas Styler.
+
+`Styler.apply` computes CSS cell by cell in Python and Streamlit then
+serializes every cell's style, which gets slow beyond a few thousand rows.
+Instead, categories are mapped to colored labels with one array lookup and the
+browser colors them via `st.column_config.MultiselectColumn`.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def colored_labels(values, colors):
+    """Turn a column of categories into one-element label lists.
+
+    `colors` maps each category to a color. Values that aren't in `colors` get
+    no label. Rows share one list object per category, so this costs a single
+    vectorized lookup, not an allocation per row.
+    """
+    categories = list(colors)
+    lookup = np.empty(len(categories) + 1, dtype=object)
+    lookup[:-1] = [[category] for category in categories]
+    # Code -1 (unknown category) picks the last slot.
+    lookup[-1] = []
+    codes = pd.Categorical(values, categories=categories).codes
+    return pd.Series(lookup[codes], index=getattr(values, "index", None), name=getattr(values, "name", None))
+
+
+def labels_column(colors, **kwargs):
+    """Column config that renders `colored_labels` output in `colors`."""
+    return st.column_config.MultiselectColumn(
+        options=list(colors), color=list(colors.values()), disabled=True, **kwargs
+    )
@@ -0,0 +1,35 @@
+"""Bitmask index for list-valued tag columns.
+
+Each row's tags are dictionary-encoded against a fixed vocabulary into a row of
+uint64 words (bit `i` set if the row has `vocabulary[i]`), so "rows with any/all
+of these tags" becomes a vectorized bitwise operation instead of a Python loop.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def encode_tags(tag_lists, vocabulary):
+    """Encode an iterable of tag lists into an array of shape (rows, words)."""
+    tags = pd.Series(list(tag_lists), dtype=object).explode().dropna()
+    codes = pd.Categorical(tags, categories=vocabulary).codes.astype(np.int64)
+    if (codes < 0).any():
+        unknown = sorted(set(tags[codes < 0]))
+        raise ValueError(f"Tags not in vocabulary: {unknown}")
+
+    n_rows = len(tag_lists)
+    masks = np.zeros((n_rows, max(1, -(-len(vocabulary) // 64))), dtype=np.uint64)
+    bits = np.left_shift(np.uint64(1), (codes % 64).astype(np.uint64))
+    np.bitwise_or.at(masks, (tags.index.to_numpy(), codes // 64), bits)
+    return masks
+
+
+def tag_filter(masks, tags, vocabulary, match="any"):
+    """Boolean row mask for rows having `match` ("any" or "all") of `tags`."""
+    query = encode_tags([tags], vocabulary)[0]
+    hits = masks & query
+    if match == "any":
+        return hits.any(axis=1)
+    if match == "all":
+        return (hits == query).all(axis=1)
+    raise ValueError(f'match must be "any" or "all", got {match!r}')
@@ -0,0 +1,185 @@
+"""Self-host the theme fonts instead of loading them from Google Fonts.
+
+Run `python vendor_fonts.py` as a build step before deploying. It downloads the
+fonts, subsets them to the glyphs the app actually uses, writes them to
+`static/fonts/` and points `.streamlit/config.toml` at them. Requires
+`fonttools` and `brotli` (for woff2), which are only needed at build time.
+
+File names contain a content hash, so they never change in place. Streamlit
+serves `static/` with ETag/Last-Modified revalidation only; if the app sits
+behind a proxy or CDN, let it add `Cache-Control: public, max-age=31536000,
+immutable` for `/app/static/fonts/`.
+"""
+
+import hashlib
+import io
+import re
+import string
+import urllib.request
+from pathlib import Path
+
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+ROOT = Path(__file__).parent
+FONTS_DIR = ROOT / "static" / "fonts"
+CONFIG_PATH = ROOT / ".streamlit" / "config.toml"
+
+# Theme option -> (family, Google Fonts CSS URL).
+FONTS = {
+    "font": (
+        "Space Grotesk",
+        "https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@300..700&display=swap",
+    ),
+    "codeFont": (
+        "Space Mono",
+        "https://fonts.googleapis.com/css2?family=Space+Mono:ital,wght@0,400;0,700;1,400;1,700&display=swap",
+    ),
+}
+
+# Google Fonts only returns woff2 to browsers it recognizes.
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0 Safari/537.36"
+)
+
+BEGIN_MARKER = "# BEGIN vendored fonts (generated by vendor_fonts.py)"
+END_MARKER = "# END vendored fonts"
+
+
+def fetch(url):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request) as response:
+        return response.read()
+
+
+def parse_font_faces(css):
+    faces = []
+    for block in re.findall(r"@font-face\s*{(.*?)}", css, re.DOTALL):
+        props = dict(re.findall(r"([\w-]+)\s*:\s*([^;]+);", block))
+        faces.append(
+            {
+                "style": props["font-style"].strip(),
+                "weight": props["font-weight"].strip(),
+                "url": re.search(r"url\(([^)]+)\)", props["src"]).group(1),
+                "unicode_range": props.get("unicode-range", "U+0-10FFFF").strip(),
+            }
+        )
+    return faces
+
+
+def parse_unicode_range(unicode_range):
+    codepoints = set()
+    for part in unicode_range.split(","):
+        part = part.strip().removeprefix("U+").removeprefix("u+")
+        if "?" in part:
+            start, end = part.replace("?", "0"), part.replace("?", "F")
+        elif "-" in part:
+            start, end = part.split("-")
+        else:
+            start = end = part
+        codepoints.update(range(int(start, 16), int(end, 16) + 1))
+    return codepoints
+
+
+def used_codepoints():
+    """Characters that appear in the app, plus printable ASCII and Latin-1 for
+    user data (company names, search input, ...)."""
+    text = string.printable + "".join(map(chr, range(0xA0, 0x100)))
+    for path in ROOT.glob("*.py"):
+        text += path.read_text(encoding="utf-8")
+    text += CONFIG_PATH.read_text(encoding="utf-8")
+    return {ord(char) for char in text}
+
+
+def subset_font(data, codepoints):
+    font = TTFont(io.BytesIO(data))
+    options = subset.Options()
+    options.layout_features = ["*"]
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    font.flavor = "woff2"
+    out = io.BytesIO()
+    font.save(out)
+    return out.getvalue()
+
+
+def vendor_font(family, css_url, codepoints):
+    """Download and subset one family. Returns its [[theme.fontFaces]] tables."""
+    font_faces = []
+    slug = family.lower().replace(" ", "-")
+    for face in parse_font_faces(fetch(css_url).decode()):
+        needed = parse_unicode_range(face["unicode_range"]) & codepoints
+        # Google splits each face into files per script; skip unused scripts.
+        if not needed:
+            continue
+        data = subset_font(fetch(face["url"]), needed)
+        digest = hashlib.sha256(data).hexdigest()[:10]
+        weight = face["weight"].replace(" ", "-")
+        filename = f"{slug}-{face['style']}-{weight}-{digest}.woff2"
+        (FONTS_DIR / filename).write_bytes(data)
+        font_faces.append(
+            {
+                "family": family,
+                "url": f"app/static/fonts/{filename}",
+                "weight": face["weight"],
+                "style": face["style"],
+                "unicodeRange": face["unicode_range"],
+            }
+        )
+        print(f"  {filename}: {len(data) / 1024:.1f} KiB")
+    return font_faces
+
+
+def update_config(families, font_faces):
+    config = CONFIG_PATH.read_text(encoding="utf-8")
+    for option, family in families.items():
+        config = re.sub(
+            rf'^{option} = ".*"$', f'{option} = "{family}"', config, flags=re.MULTILINE
+        )
+
+    # Drop the block from a previous run.
+    config = re.sub(
+        rf"\n*{re.escape(BEGIN_MARKER)}.*?{re.escape(END_MARKER)}\n*",
+        "\n",
+        config,
+        flags=re.DOTALL,
+    )
+
+    # TOML tables can only be defined once, so add to an existing [server] table.
+    if not re.search(r"^enableStaticServing = true$", config, flags=re.MULTILINE):
+        if re.search(r"^\[server\]$", config, flags=re.MULTILINE):
+            config = re.sub(
+                r"^\[server\]$", "[server]\nenableStaticServing = true", config, flags=re.MULTILINE
+            )
+        else:
+            config = config.rstrip("\n") + "\n\n[server]\nenableStaticServing = true\n"
+
+    lines = [BEGIN_MARKER]
+    for face in font_faces:
+        lines += ["", "[[theme.fontFaces]]"]
+        lines += [f'{key} = "{value}"' for key, value in face.items()]
+    lines.append(END_MARKER)
+    CONFIG_PATH.write_text(config.rstrip("\n") + "\n\n" + "\n".join(lines) + "\n")
+
+
+def main():
+    FONTS_DIR.mkdir(parents=True, exist_ok=True)
+    for old_file in FONTS_DIR.glob("*.woff2"):
+        old_file.unlink()
+
+    codepoints = used_codepoints()
+    families = {}
+    font_faces = []
+    for option, (family, css_url) in FONTS.items():
+        print(f"{family}:")
+        families[option] = family
+        font_faces += vendor_font(family, css_url, codepoints)
+
+    update_config(families, font_faces)
+    print(f"Updated {CONFIG_PATH.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()